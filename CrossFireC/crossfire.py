@@ -1,29 +1,27 @@
 from __future__ import annotations
 import argparse
 import concurrent.futures as _fut
-import hashlib
-import io
+import contextlib
+import functools
+import itertools
 import json
+import mmap
 import os
 import platform
 import shutil
+import signal
+import socket
 import stat
 import subprocess
 import sys
-import tempfile
 import threading
 import time
-import urllib.parse
-import urllib.request
-from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional, Tuple, Any, Union
-import queue
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, Union, Iterable
 import re
 from datetime import datetime, timedelta
 import sqlite3
 from pathlib import Path
-import requests
-import xml.etree.ElementTree as ET
 
 __version__ = "CrossFire v4.0 - BlackBase (Release)"
 
@@ -34,6 +32,9 @@ DEFAULT_UPDATE_URL = "https://raw.githubusercontent.com/crossfire-pm/crossfire-l
 CROSSFIRE_DIR = Path.home() / ".crossfire"
 CROSSFIRE_DB = CROSSFIRE_DIR / "packages.db"
 CROSSFIRE_CACHE = CROSSFIRE_DIR / "cache"
+CROSSFIRE_MANAGERS_CACHE = CROSSFIRE_CACHE / "managers.json"
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024  # Copy/hash chunk size for downloaded files
+SPEEDTEST_CHUNK_SIZE = 256 * 1024  # Bytes per read during the speed test
 
 # Ensure CrossFire directory exists
 CROSSFIRE_DIR.mkdir(exist_ok=True)
@@ -74,40 +75,134 @@ class Colors:
     CYAN = "\033[96m"
     RESET = "\033[0m"
 
+# Terminal capability doesn't change during a run; check it once.
+_IS_TTY = sys.stdout.isatty()
+# Keyed by both spellings callers use, so cprint never has to upper() the level
+_COLOR_PREFIX = {key: value for name, value in vars(Colors).items() if name.isupper()
+                 for key in (name, name.lower())}
+_COLOR_SUFFIX = f"{Colors.RESET}\n"
+_QUIET_LEVELS = frozenset(("INFO", "WARNING", "SUCCESS"))
+
 class Logger:
     def __init__(self):
         self.quiet = False
         self.verbose = False
         self.json_mode = False
+        self._batch: Optional[List[str]] = None
 
     def cprint(self, text, color="INFO"):
         if self.json_mode:
             return
-        if self.quiet and color in ["INFO", "WARNING"]:
-            return
-        if self.quiet and color in ["SUCCESS"]:
-            return
-        if not sys.stdout.isatty():
-            sys.stdout.write(f"{text}\n")
+        if self.quiet and color in _QUIET_LEVELS:
             return
+        if not _IS_TTY:
+            line = f"{text}\n"
+        else:
+            line = f"{_COLOR_PREFIX.get(color, Colors.INFO)}{text}{_COLOR_SUFFIX}"
         
-        color_code = getattr(Colors, color.upper(), Colors.INFO)
-        print(f"{color_code}{text}{Colors.RESET}")
+        if self._batch is not None:
+            self._batch.append(line)
+        else:
+            sys.stdout.write(line)
+
+    @contextlib.contextmanager
+    def batched(self):
+        """Collect cprint output and emit it with a single write when the block exits."""
+        if self._batch is not None:
+            # Already batching; the outermost block flushes
+            yield
+            return
+        self._batch = []
+        try:
+            yield
+        finally:
+            lines, self._batch = self._batch, None
+            if lines:
+                sys.stdout.write("".join(lines))
+                sys.stdout.flush()
 
 LOG = Logger()
 cprint = LOG.cprint
 
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+try:
+    import ijson  # type: ignore
+except ImportError:
+    ijson = None
+
+def json_dumps(obj: Any, newline: bool = False) -> bytes:
+    """Serialize --json output to UTF-8, using orjson when it is installed.
+    
+    Output is indented for a terminal and compact when piped to another program.
+    With newline=True a trailing "\\n" is produced by the encoder itself, saving
+    a copy of the whole document to append it.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if _IS_TTY else 0
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, default=str, option=option)
+    if _IS_TTY:
+        text = json.dumps(obj, indent=2, default=str, ensure_ascii=False)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), default=str, ensure_ascii=False)
+    return (text + "\n" if newline else text).encode()
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON text or UTF-8 bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def emit_json(obj: Any) -> None:
+    """Write a --json result to stdout with a single write."""
+    data = json_dumps(obj, newline=True)
+    out = getattr(sys.stdout, "buffer", None)
+    if out is None:
+        sys.stdout.write(data.decode())
+        return
+    sys.stdout.flush()
+    out.write(data)
+    out.flush()
+
+_BOOL_STR = {True: "true", False: "false"}
+
 # ============================================================================
 # Database System for Package Tracking
 # ============================================================================
 class PackageDB:
     def __init__(self, db_path: Path = CROSSFIRE_DB):
         self.db_path = db_path
+        # One connection for the process, shared by worker threads under a lock;
+        # sqlite3 then reuses its cached prepared statements across calls.
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._init_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with per-connection tuning applied."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # WAL (set once in _init_db) only needs NORMAL sync to stay consistent
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+    
+    @contextlib.contextmanager
+    def _locked(self):
+        """Yield the shared connection while holding the DB lock."""
+        with self._lock:
+            yield self._conn
+    
     def _init_db(self):
         """Initialize the SQLite database for package tracking."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._conn
+        conn.execute('PRAGMA journal_mode=WAL')
         conn.execute('''
             CREATE TABLE IF NOT EXISTS installed_packages (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -119,39 +214,76 @@ class PackageDB:
                 UNIQUE(name, manager)
             )
         ''')
+        # Serves the "recent installations" range query without a table scan
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_installed_date ON installed_packages(install_date)')
+        # Caches written before the lowercase columns existed are simply rebuilt
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(brew_formulae)')}
+        if columns and 'name_lc' not in columns:
+            conn.execute('DROP TABLE brew_formulae')
+            conn.execute("DELETE FROM cache_meta WHERE key LIKE 'brew_formulae_%'")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS brew_formulae (
+                name TEXT PRIMARY KEY,
+                desc TEXT NOT NULL DEFAULT '',
+                version TEXT,
+                homepage TEXT,
+                name_lc TEXT NOT NULL DEFAULT '',
+                desc_lc TEXT NOT NULL DEFAULT ''
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS manager_stats (
+                pattern TEXT NOT NULL,
+                manager TEXT NOT NULL,
+                ok_count INTEGER NOT NULL DEFAULT 0,
+                fail_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (pattern, manager)
+            )
+        ''')
         conn.commit()
-        conn.close()
     
     def add_package(self, name: str, version: str, manager: str, command: str = ""):
         """Record a successfully installed package."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+        with self._locked() as conn:
             conn.execute('''
                 INSERT OR REPLACE INTO installed_packages 
                 (name, version, manager, install_command) 
                 VALUES (?, ?, ?, ?)
             ''', (name, version or "unknown", manager, command))
             conn.commit()
-        finally:
-            conn.close()
+    
+    def add_packages_batch(self, rows: List[Tuple[str, str, str, str]]):
+        """Record several installs, as (name, version, manager, command) rows, in one transaction."""
+        if not rows:
+            return
+        with self._locked() as conn:
+            with conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO installed_packages 
+                    (name, version, manager, install_command) 
+                    VALUES (?, ?, ?, ?)
+                ''', [(name, version or "unknown", manager, command)
+                      for name, version, manager, command in rows])
     
     def remove_package(self, name: str, manager: str = None):
         """Remove a package record."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+        with self._locked() as conn:
             if manager:
                 conn.execute('DELETE FROM installed_packages WHERE name = ? AND manager = ?', 
                            (name, manager))
             else:
                 conn.execute('DELETE FROM installed_packages WHERE name = ?', (name,))
             conn.commit()
-        finally:
-            conn.close()
     
     def get_installed_packages(self, manager: str = None) -> List[Dict]:
         """Get list of installed packages."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+        with self._locked() as conn:
             if manager:
                 cursor = conn.execute('''
                     SELECT name, version, manager, install_date 
@@ -163,18 +295,84 @@ class PackageDB:
                 cursor = conn.execute('''
                     SELECT name, version, manager, install_date 
                     FROM installed_packages 
-                    ORDER BY install_date DESC
+                    ORDER BY install_date DESC, id DESC
                 ''')
             
             columns = [desc[0] for desc in cursor.description]
             return [dict(zip(columns, row)) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+    
+    def get_recent_installed(self, limit: int) -> List[Dict]:
+        """The `limit` most recently installed packages, newest first."""
+        with self._locked() as conn:
+            cursor = conn.execute('''
+                SELECT name, version, manager, install_date 
+                FROM installed_packages 
+                ORDER BY install_date DESC
+                LIMIT ?
+            ''', (limit,))
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    
+    def iter_grouped_by_manager(self) -> Iterable[Tuple[str, List[Dict]]]:
+        """Yield (manager, packages) by manager name, newest install first in each group."""
+        with self._locked() as conn:
+            cursor = conn.execute('''
+                SELECT name, version, manager, install_date 
+                FROM installed_packages 
+                ORDER BY manager ASC, install_date DESC
+            ''')
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+        # Grouped after the lock is released, so callers may query while iterating
+        for manager, group in itertools.groupby(rows, key=lambda row: row[2]):
+            yield manager, [dict(zip(columns, row)) for row in group]
+    
+    def get_names_versions(self, manager: str) -> List[Tuple[str, str]]:
+        """(name, version) rows for one manager, sorted by name."""
+        with self._locked() as conn:
+            return conn.execute(
+                'SELECT name, version FROM installed_packages WHERE manager = ? ORDER BY name',
+                (manager,)
+            ).fetchall()
+    
+    def count_installed(self) -> int:
+        """Total number of recorded packages."""
+        with self._locked() as conn:
+            return conn.execute('SELECT COUNT(*) FROM installed_packages').fetchone()[0]
+    
+    def count_by_manager(self) -> Dict[str, int]:
+        """Number of recorded packages per manager, most recently used manager first."""
+        # Same key order as walking get_installed_packages() (newest first); ids
+        # grow with install_date, so they break same-second ties the same way
+        with self._locked() as conn:
+            cursor = conn.execute('''
+                SELECT manager, COUNT(*) FROM installed_packages
+                GROUP BY manager
+                ORDER BY MAX(install_date) DESC, MAX(id) DESC
+            ''')
+            return dict(cursor.fetchall())
+    
+    def recent_installations(self, since: datetime, limit: Optional[int] = None) -> List[Dict]:
+        """Packages installed after `since`, newest first."""
+        # install_date is stored as 'YYYY-MM-DD HH:MM:SS', so string order is time order
+        query = '''
+            SELECT name, manager, install_date AS date
+            FROM installed_packages
+            WHERE install_date > ?
+            ORDER BY install_date DESC
+        '''
+        params: Tuple[Any, ...] = (since.strftime('%Y-%m-%d %H:%M:%S'),)
+        if limit is not None:
+            query += ' LIMIT ?'
+            params += (limit,)
+        with self._locked() as conn:
+            cursor = conn.execute(query, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def is_installed(self, name: str, manager: str = None) -> bool:
         """Check if a package is recorded as installed."""
-        conn = sqlite3.connect(self.db_path)
-        try:
+        with self._locked() as conn:
             if manager:
                 cursor = conn.execute(
                     'SELECT COUNT(*) FROM installed_packages WHERE name = ? AND manager = ?',
@@ -186,8 +384,103 @@ class PackageDB:
                     (name,)
                 )
             return cursor.fetchone()[0] > 0
-        finally:
-            conn.close()
+    
+    def record_attempts(self, rows: Iterable[Tuple[str, str, bool]]):
+        """Count install outcomes, as (pattern, manager, ok) rows, in one transaction."""
+        rows = [(pattern, manager, int(ok), int(not ok)) for pattern, manager, ok in rows]
+        if not rows:
+            return
+        with self._locked() as conn:
+            with conn:
+                # INSERT OR IGNORE + UPDATE rather than an upsert, which needs SQLite 3.24+
+                conn.executemany('''
+                    INSERT OR IGNORE INTO manager_stats (pattern, manager, ok_count, fail_count)
+                    VALUES (?, ?, 0, 0)
+                ''', [(pattern, manager) for pattern, manager, _, _ in rows])
+                conn.executemany('''
+                    UPDATE manager_stats
+                    SET ok_count = ok_count + ?, fail_count = fail_count + ?
+                    WHERE pattern = ? AND manager = ?
+                ''', [(ok, fail, pattern, manager) for pattern, manager, ok, fail in rows])
+    
+    def attempt_stats(self, pattern: str) -> Dict[str, Tuple[int, int]]:
+        """Return {manager: (ok_count, fail_count)} recorded for a package pattern."""
+        with self._locked() as conn:
+            cursor = conn.execute(
+                'SELECT manager, ok_count, fail_count FROM manager_stats WHERE pattern = ?',
+                (pattern,)
+            )
+            return {manager: (ok, fail) for manager, ok, fail in cursor}
+    
+    def brew_formulae_age(self) -> Optional[float]:
+        """Seconds since the Homebrew formulae were cached, or None if never."""
+        with self._locked() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache_meta WHERE key = 'brew_formulae_fetched'"
+            ).fetchone()
+            return time.time() - float(row[0]) if row else None
+    
+    def brew_formulae_etag(self) -> Optional[str]:
+        """ETag the cached Homebrew formulae were served with, if any."""
+        with self._locked() as conn:
+            row = conn.execute(
+                "SELECT value FROM cache_meta WHERE key = 'brew_formulae_etag'"
+            ).fetchone()
+            return row[0] if row else None
+    
+    def touch_brew_formulae(self):
+        """Mark the cached Homebrew formulae as fresh (server reported no change)."""
+        with self._locked() as conn:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('brew_formulae_fetched', ?)",
+                    (str(time.time()),)
+                )
+    
+    def replace_brew_formulae(self, formulae: Iterable[Dict[str, Any]], etag: Optional[str] = None):
+        """Replace the cached Homebrew formulae in a single transaction.
+        
+        formulae may be a lazy iterator; rows are inserted as it yields them.
+        """
+        def _row(f: Dict[str, Any]) -> Tuple[str, str, str, Optional[str], str, str]:
+            # Lowercase once here so searches don't re-lowercase every row
+            name, desc = f.get("name") or "", f.get("desc") or ""
+            return (name, desc, (f.get("versions") or {}).get("stable", "unknown"),
+                    f.get("homepage"), name.lower(), desc.lower())
+        
+        rows = map(_row, formulae)
+        with self._locked() as conn:
+            with conn:
+                conn.execute('DELETE FROM brew_formulae')
+                conn.executemany(
+                    'INSERT OR REPLACE INTO brew_formulae (name, desc, version, homepage, name_lc, desc_lc) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('brew_formulae_fetched', ?)",
+                    (str(time.time()),)
+                )
+                if etag:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('brew_formulae_etag', ?)",
+                        (etag,)
+                    )
+                else:
+                    conn.execute("DELETE FROM cache_meta WHERE key = 'brew_formulae_etag'")
+    
+    def search_brew_formulae(self, query: str, limit: int = 10) -> List[Tuple[str, str, str, Optional[str], int]]:
+        """Substring-match cached formulae; name hits score 50, description hits 30."""
+        with self._locked() as conn:
+            return conn.execute('''
+                SELECT name, desc, version, homepage,
+                       (CASE WHEN instr(name_lc, ?1) > 0 THEN 50 ELSE 0 END) +
+                       (CASE WHEN instr(desc_lc, ?1) > 0 THEN 30 ELSE 0 END) AS score
+                FROM brew_formulae
+                WHERE score > 0
+                ORDER BY score DESC, rowid
+                LIMIT ?2
+            ''', (query.lower(), limit)).fetchall()
 
 package_db = PackageDB()
 
@@ -195,6 +488,9 @@ package_db = PackageDB()
 # Progress/ETA System
 # ============================================================================
 class ProgressBar:
+    # Shared by all bars; refreshed on SIGWINCH instead of queried per bar
+    _term_width = shutil.get_terminal_size((80, 20)).columns
+
     def __init__(self, total, description, unit):
         self.total = total
         self.description = description
@@ -203,15 +499,28 @@ class ProgressBar:
         self.start_time = time.time()
         self.lock = threading.Lock()
         self.bar_length = 50
-        self.terminal_width = shutil.get_terminal_size((80, 20)).columns
+        self._last_draw = 0.0
+        self._pending = False
+
+    # Redraws are capped at ~10 Hz; drawing on every chunk made fast downloads
+    # and bursts of quick installs bound by terminal writes.
+    REDRAW_INTERVAL = 0.1
 
     def update(self, step=1):
+        if step <= 0:
+            return  # Nothing moved (e.g. an idle download poll); keep the current frame
         with self.lock:
             self.current = min(self.current + step, self.total)
-            self._draw_bar()
+            now = time.monotonic()
+            if self.current >= self.total or now - self._last_draw >= self.REDRAW_INTERVAL:
+                self._last_draw = now
+                self._pending = False
+                self._draw_bar()
+            else:
+                self._pending = True
 
     def _draw_bar(self):
-        if LOG.json_mode or not sys.stdout.isatty():
+        if LOG.json_mode or not _IS_TTY:
             return
         
         progress = self.current / self.total if self.total > 0 else 0
@@ -244,20 +553,41 @@ class ProgressBar:
             
         full_msg = f"{self.description}: |{bar}| {percent:.1f}% ({self.current}/{self.total} {self.unit}){speed_str} - ETA: {eta_str}"
         
-        if len(full_msg) > self.terminal_width:
-            full_msg = full_msg[:self.terminal_width - 4] + "..."
+        # Read per draw so a SIGWINCH mid-download takes effect
+        width = ProgressBar._term_width
+        if len(full_msg) > width:
+            full_msg = full_msg[:width - 4] + "..."
         
         sys.stdout.write(f"\r{full_msg}")
         sys.stdout.flush()
 
     def finish(self):
-        if not LOG.json_mode and sys.stdout.isatty():
+        with self.lock:
+            if self._pending:
+                # Show the final state that throttling skipped
+                self._pending = False
+                self._draw_bar()
+        if not LOG.json_mode and _IS_TTY:
             sys.stdout.write("\n")
             sys.stdout.flush()
 
+def _refresh_terminal_width(signum=None, frame=None):
+    ProgressBar._term_width = shutil.get_terminal_size((80, 20)).columns
+
+if _IS_TTY and hasattr(signal, "SIGWINCH") and signal.getsignal(signal.SIGWINCH) == signal.SIG_DFL:
+    # signal() only works from the main thread; keep the startup width otherwise
+    with contextlib.suppress(ValueError):
+        signal.signal(signal.SIGWINCH, _refresh_terminal_width)
+
 # ============================================================================
 # Network Speed & Connectivity Testing
 # ============================================================================
+_PING_RE = {
+    "Windows": re.compile(r"time[<=](\d+)ms"),
+    "posix": re.compile(r"time=(\d+\.?\d*)\s*ms"),
+}
+_PING_LATENCY_RE = _PING_RE["Windows" if OS_NAME == "Windows" else "posix"]
+
 class SpeedTest:
     @staticmethod
     def test_download_speed(url: Optional[str] = None, duration: int = 10) -> Dict[str, Any]:
@@ -278,21 +608,21 @@ class SpeedTest:
             
             cprint(f"Testing download speed from: {url}", "INFO")
             
+            import urllib.request  # Only the network commands pay for this import
             request = urllib.request.Request(url)
             with urllib.request.urlopen(request, timeout=30) as response:
                 total_size = int(response.info().get("Content-Length", 10*1024*1024))  # Default 10MB
                 
                 tracker = ProgressBar(min(total_size, 50*1024*1024), "Speed Test", "B")  # Cap at 50MB
                 
-                while time.time() - start_time < duration:
-                    try:
-                        chunk = response.read(32768)  # 32KB chunks
-                        if not chunk:
-                            break
+                try:
+                    for chunk in iter(lambda: response.read(SPEEDTEST_CHUNK_SIZE), b""):
                         downloaded_bytes += len(chunk)
                         tracker.update(len(chunk))
-                    except:
-                        break
+                        if time.time() - start_time >= duration:
+                            break
+                except:
+                    pass
                 
                 tracker.finish()
                 
@@ -316,50 +646,54 @@ class SpeedTest:
             cprint(f"Speed test failed: {e}", "ERROR")
             return {"ok": False, "error": str(e)}
 
+    @staticmethod
+    def _ping_host(host: str) -> Tuple[Dict[str, Any], str, str]:
+        """Ping one host; returns (result, message, color)."""
+        try:
+            if OS_NAME == "Windows":
+                command = ["ping", "-n", "1", "-w", "5000", host]
+            else:
+                command = ["ping", "-c", "1", "-W", "5", host]
+                
+            process = subprocess.run(command, capture_output=True, text=True, timeout=10)
+            output = process.stdout
+            
+            # Parse ping output for latency
+            latency_match = _PING_LATENCY_RE.search(output)
+            
+            if latency_match:
+                latency = float(latency_match.group(1))
+                return {"ok": True, "latency_ms": latency}, f"{host}: {latency}ms", "SUCCESS"
+            return {"ok": False, "msg": "Could not parse ping output"}, f"{host}: Could not parse ping output", "WARNING"
+                
+        except subprocess.TimeoutExpired:
+            return {"ok": False, "msg": "Timed out"}, f"{host}: Timed out", "WARNING"
+        except Exception as e:
+            return {"ok": False, "msg": str(e)}, f"{host}: {str(e)}", "ERROR"
+
     @staticmethod
     def ping_test() -> Dict[str, Any]:
         cprint("Starting network latency test...", "INFO")
         
         hosts = ["google.com", "github.com", "cloudflare.com", "8.8.8.8"]
-        results = {}
+        outcomes = {}
         
         progress = ProgressBar(len(hosts), "Ping test", "hosts")
         
-        for host in hosts:
-            try:
-                if OS_NAME == "Windows":
-                    command = ["ping", "-n", "1", "-w", "5000", host]
-                else:
-                    command = ["ping", "-c", "1", "-W", "5", host]
-                    
-                process = subprocess.run(command, capture_output=True, text=True, timeout=10)
-                output = process.stdout
-                
-                # Parse ping output for latency
-                if OS_NAME == "Windows":
-                    latency_match = re.search(r"time[<=](\d+)ms", output)
-                else:
-                    latency_match = re.search(r"time=(\d+\.?\d*)\s*ms", output)
-                
-                if latency_match:
-                    latency = float(latency_match.group(1))
-                    results[host] = {"ok": True, "latency_ms": latency}
-                    cprint(f"{host}: {latency}ms", "SUCCESS")
-                else:
-                    results[host] = {"ok": False, "msg": "Could not parse ping output"}
-                    cprint(f"{host}: Could not parse ping output", "WARNING")
-                    
-            except subprocess.TimeoutExpired:
-                results[host] = {"ok": False, "msg": "Timed out"}
-                cprint(f"{host}: Timed out", "WARNING")
-            except Exception as e:
-                results[host] = {"ok": False, "msg": str(e)}
-                cprint(f"{host}: {str(e)}", "ERROR")
-            
-            progress.update()
+        # Pings are independent and mostly waiting on the network; run them together
+        with _fut.ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            future_to_host = {executor.submit(SpeedTest._ping_host, host): host for host in hosts}
+            for future in _fut.as_completed(future_to_host):
+                host = future_to_host[future]
+                result, message, color = future.result()
+                outcomes[host] = result
+                cprint(message, color)
+                progress.update()
             
         progress.finish()
         
+        results = {host: outcomes[host] for host in hosts}
+        
         # Calculate average latency
         successful_pings = [r["latency_ms"] for r in results.values() if r.get("ok")]
         if successful_pings:
@@ -371,7 +705,7 @@ class SpeedTest:
 # ============================================================================
 # Real Search Engine Implementation (Complete & OS-aware)
 # ============================================================================
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     name: str
     description: str
@@ -381,13 +715,42 @@ class SearchResult:
     relevance_score: float = 0.0
     
     def to_dict(self):
-        return asdict(self)
+        # All fields are scalars, so skip asdict()'s recursive deepcopy
+        return {
+            "name": self.name,
+            "description": self.description,
+            "version": self.version,
+            "manager": self.manager,
+            "homepage": self.homepage,
+            "relevance_score": self.relevance_score,
+        }
+
+def _require_requests():
+    """Import requests on first use; exit with an install hint if it is missing."""
+    try:
+        import requests
+        import requests.adapters
+    except ImportError:
+        cprint("Missing required dependency 'requests'. Install with: pip install requests", "ERROR")
+        sys.exit(1)
+    return requests
 
 class RealSearchEngine:
     def __init__(self):
+        requests = _require_requests()
+        from urllib3.util.retry import Retry
+        
         self.cache_timeout = 3600  # 1 hour cache
         self.session = requests.Session()
         self.session.timeout = 30
+        # Searches fan out across threads; give each host enough pooled
+        # keep-alive connections, and retry transient connection failures.
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=20, pool_maxsize=20,
+            max_retries=Retry(total=2, backoff_factor=0.3),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
     
     def search(self, query: str, manager: Optional[str] = None, limit: int = 20) -> List[SearchResult]:
         """Search across installed and OS-supported package managers."""
@@ -423,7 +786,9 @@ class RealSearchEngine:
             "flatpak": self._search_flatpak,
         }
         
-        with _fut.ThreadPoolExecutor(max_workers=5) as executor:
+        # One worker per manager: every lookup is a network or subprocess wait,
+        # so none should queue behind another.
+        with _fut.ThreadPoolExecutor(max_workers=len(target_managers)) as executor:
             future_to_manager = {}
             for mgr in target_managers:
                 func = manager_funcs.get(mgr)
@@ -494,27 +859,33 @@ class RealSearchEngine:
     def _search_brew(self, query: str) -> List[SearchResult]:
         try:
             url = "https://formulae.brew.sh/api/formula.json"
-            cache_file = CROSSFIRE_CACHE / "brew_formulae.json"
-            if cache_file.exists() and (time.time() - cache_file.stat().st_mtime < self.cache_timeout):
-                formulae = json.load(open(cache_file))
-            else:
-                r = self.session.get(url, timeout=20)
-                if r.status_code != 200:
+            # Formulae are cached in the package DB and matched in SQL, so warm
+            # searches don't re-parse the multi-MB JSON.
+            age = package_db.brew_formulae_age()
+            if age is None or age >= self.cache_timeout:
+                # Revalidate with the stored ETag; a 304 means the cached rows
+                # are still current and nothing needs downloading.
+                etag = package_db.brew_formulae_etag() if age is not None else None
+                headers = {"If-None-Match": etag} if etag else {}
+                r = self.session.get(url, headers=headers, timeout=20, stream=ijson is not None)
+                if r.status_code == 304:
+                    package_db.touch_brew_formulae()
+                elif r.status_code == 200:
+                    if ijson is not None:
+                        # Parse formulae one at a time off the socket instead of
+                        # building the whole list in memory first.
+                        r.raw.decode_content = True
+                        formulae = ijson.items(r.raw, "item")
+                    else:
+                        formulae = json_loads(r.content)
+                    package_db.replace_brew_formulae(formulae, r.headers.get("ETag"))
+                else:
                     return []
-                formulae = r.json()
-                json.dump(formulae, open(cache_file, "w"))
-            results = []
-            for f in formulae:
-                name, desc = f.get("name", ""), f.get("desc", "")
-                score = 0
-                if query.lower() in name.lower(): score += 50
-                if query.lower() in desc.lower(): score += 30
-                if score > 0:
-                    results.append(SearchResult(
-                        name=name, description=desc[:200],
-                        version=f.get("versions", {}).get("stable", "unknown"),
-                        manager="brew", homepage=f.get("homepage"), relevance_score=score))
-            return sorted(results, key=lambda x: x.relevance_score, reverse=True)[:10]
+            return [
+                SearchResult(name=name, description=desc[:200], version=version,
+                             manager="brew", homepage=homepage, relevance_score=score)
+                for name, desc, version, homepage, score in package_db.search_brew_formulae(query, 10)
+            ]
         except:
             return []
 
@@ -549,50 +920,58 @@ class RealSearchEngine:
                         version="unknown", manager=manager, relevance_score=5))
         return results[:10]
 
-search_engine = RealSearchEngine()
+@functools.lru_cache(maxsize=1)
+def get_search_engine() -> RealSearchEngine:
+    """The shared search engine, built on first use so other commands skip its HTTP session."""
+    return RealSearchEngine()
 
 
 # ============================================================================
 # Enhanced Command Execution
 # ============================================================================
-@dataclass
+@dataclass(slots=True)
 class RunResult:
     ok: bool
     code: int
     out: str
     err: str
 
-def run_command(cmd: Union[List[str], str], timeout=300, retries=1, show_progress=False, shell=False, cwd=None) -> RunResult:
+# sudo prompts for a password on the shared terminal; commands run from
+# concurrent update/cleanup/install tasks take turns so prompts don't collide.
+_SUDO_LOCK = threading.Lock()
+
+def run_command(cmd: List[str], timeout=300, retries=1, show_progress=False, cwd=None) -> RunResult:
     """Execute a command with proper error handling and progress tracking."""
-    
-    cmd_str = ' '.join(cmd) if isinstance(cmd, list) else cmd
+    if cmd and cmd[0] == "sudo":
+        with _SUDO_LOCK:
+            return _run_command(cmd, timeout, retries, show_progress, cwd)
+    return _run_command(cmd, timeout, retries, show_progress, cwd)
+
+def _run_command(cmd: List[str], timeout, retries, show_progress, cwd) -> RunResult:
+    cmd_str = ' '.join(cmd)
     if LOG.verbose:
         cprint(f"Running: {cmd_str}", "INFO")
     
     for attempt in range(retries + 1):
         if attempt > 0:
             cprint(f"Retry attempt {attempt}/{retries}", "WARNING")
-            time.sleep(2)
+            time.sleep(min(0.25 * 2 ** attempt, 4.0))
         
         try:
             # Start the process
-            if shell:
-                process = subprocess.Popen(
-                    cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                    text=True, cwd=cwd, bufsize=1, universal_newlines=True
-                )
-            else:
-                process = subprocess.Popen(
-                    cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                    text=True, cwd=cwd, bufsize=1, universal_newlines=True
-                )
+            process = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, cwd=cwd, bufsize=1, universal_newlines=True
+            )
             
             stdout_lines = []
             stderr_lines = []
             
-            if show_progress and not LOG.json_mode:
+            done = None
+            if show_progress and not LOG.json_mode and _IS_TTY:
                 # Show progress dots for long-running commands
-                progress_thread = threading.Thread(target=_show_progress_dots, args=(process,))
+                done = threading.Event()
+                progress_thread = threading.Thread(target=_show_progress_dots, args=(done,))
                 progress_thread.daemon = True
                 progress_thread.start()
             
@@ -603,6 +982,11 @@ def run_command(cmd: Union[List[str], str], timeout=300, retries=1, show_progres
                 process.kill()
                 stdout, stderr = process.communicate()
                 return RunResult(False, -1, stdout, f"Command timed out after {timeout} seconds")
+            finally:
+                if done is not None:
+                    # Stop the spinner and let it clear its line before we print
+                    done.set()
+                    progress_thread.join()
             
             result = RunResult(
                 ok=(process.returncode == 0),
@@ -619,22 +1003,30 @@ def run_command(cmd: Union[List[str], str], timeout=300, retries=1, show_progres
             return result
             
         except Exception as e:
-            if attempt == retries:
+            # A missing executable won't appear on retry; fail fast
+            if attempt == retries or isinstance(e, FileNotFoundError):
                 return RunResult(False, -1, "", f"Exception: {str(e)}")
-            time.sleep(1)
     
     return RunResult(False, -1, "", "All retry attempts failed")
 
-def _show_progress_dots(process):
-    """Show progress dots while a process is running."""
+def _run_sequence(cmds: List[List[str]], timeout=300, show_progress=False) -> RunResult:
+    """Run argv lists in order, stopping at the first failure (like 'a && b' without a shell)."""
+    result = RunResult(False, -1, "", "No commands to run")
+    for cmd in cmds:
+        result = run_command(cmd, timeout=timeout, show_progress=show_progress)
+        if not result.ok:
+            break
+    return result
+
+def _show_progress_dots(done: threading.Event):
+    """Show progress dots until done is set."""
     spinner_chars = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
     i = 0
-    while process.poll() is None:
-        if process.poll() is not None:
-            return
+    # Event.wait returns as soon as the command finishes, instead of polling
+    # the child process every tick.
+    while not done.wait(0.1):
         sys.stdout.write(f"\r{spinner_chars[i % len(spinner_chars)]} Working...")
         sys.stdout.flush()
-        time.sleep(0.1)
         i += 1
     sys.stdout.write("\r" + " " * 20 + "\r")  # Clear the line
 
@@ -642,80 +1034,67 @@ def _show_progress_dots(process):
 # Package Manager Detection & Commands
 # ============================================================================
 
-def _get_python_commands() -> List[List[str]]:
-    """Get available Python executable commands."""
+@functools.lru_cache(maxsize=1)
+def _get_python_commands() -> Tuple[Tuple[str, ...], ...]:
+    """Get available Python executable commands (cached; see _invalidate_manager_cache)."""
     commands = []
     
     # Try current Python first
     if sys.executable:
-        commands.append([sys.executable])
+        commands.append((sys.executable,))
     
     # Try common Python commands
     for cmd in ["python3", "python", "py"]:
-        if shutil.which(cmd):
-            commands.append([cmd])
-    
-    return commands
-
-def _pip_install(pkg: str) -> List[str]:
-    python_cmds = _get_python_commands()
-    for cmd in python_cmds:
-        if shutil.which(cmd[0]):
-            return cmd + ["-m", "pip", "install", "--user", pkg]
-    return [sys.executable, "-m", "pip", "install", "--user", pkg]
-
-def _npm_install(pkg: str) -> List[str]:
-    return ["npm", "install", "-g", pkg]
-
-def _apt_install(pkg: str) -> List[str]:
-    return ["sudo", "apt", "install", "-y", pkg]
-
-def _dnf_install(pkg: str) -> List[str]:
-    return ["sudo", "dnf", "install", "-y", pkg]
-
-def _yum_install(pkg: str) -> List[str]:
-    return ["sudo", "yum", "install", "-y", pkg]
-
-def _pacman_install(pkg: str) -> List[str]:
-    return ["sudo", "pacman", "-S", "--noconfirm", pkg]
-
-def _zypper_install(pkg: str) -> List[str]:
-    return ["sudo", "zypper", "--non-interactive", "install", pkg]
-
-def _apk_install(pkg: str) -> List[str]:
-    return ["sudo", "apk", "add", pkg]
-
-def _brew_install(pkg: str) -> List[str]:
-    return ["brew", "install", pkg]
-
-def _choco_install(pkg: str) -> List[str]:
-    return ["choco", "install", "-y", pkg]
-
-def _winget_install(pkg: str) -> List[str]:
-    return ["winget", "install", "--silent", "--accept-package-agreements", "--accept-source-agreements", pkg]
+        if _on_path(cmd):
+            commands.append((cmd,))
+    
+    return tuple(commands)
+
+@functools.lru_cache(maxsize=1)
+def _pip_python() -> Tuple[str, ...]:
+    """Resolve the Python command used for pip once per process."""
+    for cmd in _get_python_commands():
+        if _on_path(cmd[0]):
+            return cmd
+    return (sys.executable,)
+
+def _pip_install(*pkgs: str) -> List[str]:
+    return [*_pip_python(), "-m", "pip", "install", "--user", *pkgs]
+
+# Fixed argv prefixes for installs; the package names are appended. pip isn't
+# listed because its interpreter is resolved at runtime (see _pip_install).
+MANAGER_INSTALL_PREFIXES: Dict[str, Tuple[str, ...]] = {
+    "npm": ("npm", "install", "-g"),
+    "apt": ("sudo", "apt", "install", "-y"),
+    "dnf": ("sudo", "dnf", "install", "-y"),
+    "yum": ("sudo", "yum", "install", "-y"),
+    "pacman": ("sudo", "pacman", "-S", "--noconfirm"),
+    "zypper": ("sudo", "zypper", "--non-interactive", "install"),
+    "apk": ("sudo", "apk", "add"),
+    "brew": ("brew", "install"),
+    "choco": ("choco", "install", "-y"),
+    "winget": ("winget", "install", "--silent", "--accept-package-agreements", "--accept-source-agreements"),
+    "snap": ("sudo", "snap", "install"),
+    "flatpak": ("flatpak", "install", "-y"),
+}
 
-def _snap_install(pkg: str) -> List[str]:
-    return ["sudo", "snap", "install", pkg]
+def _prefixed_argv(prefix: Tuple[str, ...], *pkgs: str) -> List[str]:
+    return [*prefix, *pkgs]
 
-def _flatpak_install(pkg: str) -> List[str]:
-    return ["flatpak", "install", "-y", pkg]
+# Managers that only take one package per install command
+_SINGLE_PACKAGE_MANAGERS = frozenset({"winget"})
 
 # Install command handlers
 MANAGER_INSTALL_HANDLERS: Dict[str, callable] = {
-    "pip": _pip_install, "npm": _npm_install, "apt": _apt_install, 
-    "dnf": _dnf_install, "yum": _yum_install, "pacman": _pacman_install, 
-    "zypper": _zypper_install, "apk": _apk_install, "brew": _brew_install,
-    "choco": _choco_install, "winget": _winget_install, "snap": _snap_install, 
-    "flatpak": _flatpak_install,
+    "pip": _pip_install,
+    **{name: functools.partial(_prefixed_argv, prefix) for name, prefix in MANAGER_INSTALL_PREFIXES.items()},
 }
+_SUPPORTED_MANAGERS: Tuple[str, ...] = tuple(MANAGER_INSTALL_HANDLERS)
+_MANAGER_BY_UPPER: Dict[str, str] = {k.upper(): k for k in MANAGER_INSTALL_HANDLERS}
 
 # Removal command handlers
 def _pip_remove(pkg: str) -> List[str]:
-    python_cmds = _get_python_commands()
-    for cmd in python_cmds:
-        if shutil.which(cmd[0]):
-            return cmd + ["-m", "pip", "uninstall", "-y", pkg]
-    return [sys.executable, "-m", "pip", "uninstall", "-y", pkg]
+    return [*_pip_python(), "-m", "pip", "uninstall", "-y", pkg]
 
 def _npm_remove(pkg: str) -> List[str]:
     return ["npm", "uninstall", "-g", pkg]
@@ -747,87 +1126,185 @@ MANAGER_REMOVE_HANDLERS = {
     "pacman": _pacman_remove, "snap": _snap_remove, "flatpak": _flatpak_remove,
 }
 
+# Cache cleanup commands: argv steps run in order, stopping at the first failure
+MANAGER_CLEANUP_COMMANDS: Dict[str, List[List[str]]] = {
+    "pip": [[sys.executable, "-m", "pip", "cache", "purge"]],
+    "npm": [["npm", "cache", "clean", "--force"]],
+    "brew": [["brew", "cleanup", "--prune=all"]],
+    "apt": [["sudo", "apt", "autoremove", "-y"], ["sudo", "apt", "autoclean"]],
+    "dnf": [["sudo", "dnf", "clean", "all"]],
+    "yum": [["sudo", "yum", "clean", "all"]],
+    "pacman": [["sudo", "pacman", "-Sc", "--noconfirm"]],
+}
+
+# Self-update commands (same step format)
+MANAGER_UPDATE_COMMANDS: Dict[str, List[List[str]]] = {
+    "pip": [[sys.executable, "-m", "pip", "install", "--upgrade", "pip"]],
+    "npm": [["npm", "update", "-g", "npm"]],
+    "brew": [["brew", "update"], ["brew", "upgrade"]],
+    "apt": [["sudo", "apt", "update"], ["sudo", "apt", "upgrade", "-y"]],
+    "dnf": [["sudo", "dnf", "update", "-y"]],
+    "yum": [["sudo", "yum", "update", "-y"]],
+    "pacman": [["sudo", "pacman", "-Syu", "--noconfirm"]],
+    "snap": [["sudo", "snap", "refresh"]],
+    "flatpak": [["flatpak", "update", "-y"]],
+}
+
+@functools.lru_cache(maxsize=1)
 def _os_type() -> str:
     """Returns a simplified OS name for heuristics."""
-    s = platform.system().lower()
+    s = OS_NAME.lower()
     if s.startswith("win"): return "windows"
     if s == "darwin": return "macos"
     if s == "linux": return "linux"
     return "unknown"
 
 def _detect_installed_managers() -> Dict[str, bool]:
-    """Detect available package managers."""
+    """Detect available package managers (cached for the life of the process)."""
+    return dict(_probe_installed_managers())
+
+@functools.lru_cache(maxsize=1)
+def _path_executables() -> Dict[str, List[str]]:
+    """Map command name -> matching files in PATH order, from one scandir per directory."""
+    found: Dict[str, List[str]] = {}
+    windows = OS_NAME == "Windows"
+    pathext = tuple(e.lower() for e in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").split(os.pathsep) if e)
+    
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        if not directory:
+            continue
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            name = entry.name.lower() if windows else entry.name
+            if windows and name.endswith(pathext):
+                found.setdefault(os.path.splitext(name)[0], []).append(entry.path)
+            found.setdefault(name, []).append(entry.path)
+    
+    return found
+
+def _on_path(cmd: str) -> bool:
+    """Like shutil.which(cmd) is not None, but answered from the cached PATH scan."""
+    if os.path.dirname(cmd):
+        return os.path.isfile(cmd) and os.access(cmd, os.X_OK)
+    candidates = _path_executables().get(cmd.lower() if OS_NAME == "Windows" else cmd, ())
+    # Only the few names we actually ask about pay for the permission check;
+    # as with shutil.which, a non-executable entry doesn't hide a later one
+    return any(os.path.isfile(path) and os.access(path, os.X_OK) for path in candidates)
+
+def _path_fingerprint() -> str:
+    """Hash of PATH, each PATH directory's mtime and the interpreter.
+    
+    Adding or removing an executable bumps its directory's mtime, so an
+    unchanged fingerprint means a fresh PATH scan would find the same managers.
+    """
+    import hashlib  # Only needed to key the on-disk manager cache
+    
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{__version__}\0{sys.executable}\0".encode(errors="surrogateescape"))
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtime = -1
+        h.update(f"{directory}\0{mtime}\0".encode(errors="surrogateescape"))
+    return h.hexdigest()
+
+def _write_managers_cache(fingerprint: str, available: Dict[str, bool]):
+    """Atomically replace the on-disk manager cache; failures are ignored."""
+    tmp = CROSSFIRE_MANAGERS_CACHE.with_name(f"managers.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(json_dumps({"fingerprint": fingerprint, "managers": available}))
+        os.replace(tmp, CROSSFIRE_MANAGERS_CACHE)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp.unlink()
+
+@functools.lru_cache(maxsize=1)
+def _probe_installed_managers() -> Dict[str, bool]:
+    """Probe PATH for every supported package manager.
+    
+    Results are reused across invocations while _path_fingerprint() is unchanged.
+    """
+    fingerprint = _path_fingerprint()
+    try:
+        cached = json_loads(CROSSFIRE_MANAGERS_CACHE.read_bytes())
+        if cached["fingerprint"] == fingerprint:
+            return cached["managers"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    
     available = {}
     
     for name, fn in MANAGER_INSTALL_HANDLERS.items():
         if name == "pip":
             # Check if any Python/pip combination works
             python_cmds = _get_python_commands()
-            available[name] = any(shutil.which(cmd[0]) for cmd in python_cmds if cmd)
+            available[name] = any(_on_path(cmd[0]) for cmd in python_cmds if cmd)
         else:
             # Check if the manager binary exists
-            available[name] = shutil.which(name) is not None
+            available[name] = _on_path(name)
     
+    _write_managers_cache(fingerprint, available)
     return available
 
+def _invalidate_manager_cache():
+    """Forget cached PATH lookups, e.g. after installing a package manager."""
+    with contextlib.suppress(OSError):
+        CROSSFIRE_MANAGERS_CACHE.unlink()
+    _probe_installed_managers.cache_clear()
+    _path_executables.cache_clear()
+    _get_python_commands.cache_clear()
+    _pip_python.cache_clear()
+
+
+# Built once; a single regex pass / C-level startswith instead of a Python loop per indicator
+_PY_SPECIFIER_RE = re.compile(r"[=<>~!]=")  # ==, >=, <=, ~=, !=
+_PY_COMMON_PREFIXES = ("py", "django", "flask", "numpy", "pandas", "requests", "boto3", "tensorflow", "torch")
+_NPM_COMMON = frozenset(("express", "react", "vue", "angular", "typescript", "eslint", "webpack", "lodash", "axios"))
 
 def _looks_like_python_pkg(pkg: str) -> bool:
     """Heuristics for Python packages."""
-    python_indicators = ["==", ">=", "<=", "~=", "!=", "[", "]"]
-    python_common = ["py", "django", "flask", "numpy", "pandas", "requests", "boto3", "tensorflow", "torch"]
-    
-    # Check for version specifiers
-    if any(indicator in pkg for indicator in python_indicators):
+    # Check for extras and version specifiers; every specifier contains '='
+    if "[" in pkg or "]" in pkg or ("=" in pkg and _PY_SPECIFIER_RE.search(pkg)):
         return True
     
-    # Check for common Python package prefixes/names
-    pkg_lower = pkg.lower()
-    if any(pkg_lower.startswith(prefix) for prefix in python_common):
+    # Check for common Python package prefixes/names; only copy if not already lowercase
+    if pkg.startswith(_PY_COMMON_PREFIXES):
         return True
-    
-    return False
+    return not pkg.islower() and pkg.lower().startswith(_PY_COMMON_PREFIXES)
 
 def _looks_like_npm_pkg(pkg: str) -> bool:
     """Heuristics for NPM packages."""
-    npm_indicators = pkg.startswith("@")
-    npm_common = ["express", "react", "vue", "angular", "typescript", "eslint", "webpack", "lodash", "axios"]
-    
-    if npm_indicators:
+    if pkg[:1] == "@":
         return True
     
-    pkg_lower = pkg.lower()
-    if pkg_lower in npm_common:
+    if pkg in _NPM_COMMON:
         return True
-    
-    return False
+    return not pkg.islower() and pkg.lower() in _NPM_COMMON
+
+_LINUX_MANAGER_ORDER = ("apt", "dnf", "yum", "pacman", "zypper", "apk")
 
-def _system_manager_priority() -> List[str]:
+def _system_manager_priority(installed: Dict[str, bool]) -> Tuple[str, ...]:
     """Returns a prioritized list of system package managers for the current OS."""
     ot = _os_type()
     
     if ot == "macos": 
-        return ["brew", "snap", "flatpak"]
+        return ("brew", "snap", "flatpak")
     elif ot == "windows": 
-        return ["winget", "choco"]
+        return ("winget", "choco")
     elif ot == "linux":
-        # Detect Linux distribution and prioritize accordingly
-        linux_managers = [
-            ("apt", ["apt", "apt-get"]),
-            ("dnf", ["dnf"]),
-            ("yum", ["yum"]),
-            ("pacman", ["pacman"]),
-            ("zypper", ["zypper"]),
-            ("apk", ["apk"])
-        ]
-        
-        for manager, commands in linux_managers:
-            if any(shutil.which(cmd) for cmd in commands):
-                return [manager, "snap", "flatpak"]
+        # Prioritize the distribution's native manager, using the caller's detection
+        for manager in _LINUX_MANAGER_ORDER:
+            if installed.get(manager):
+                return (manager, "snap", "flatpak")
         
         # Fallback to universal package managers
-        return ["snap", "flatpak"]
+        return ("snap", "flatpak")
     
-    return ["snap", "flatpak"]
+    return ("snap", "flatpak")
 
 def _ordered_install_manager_candidates(pkg: str, installed: Dict[str, bool]) -> List[str]:
     """Generates a prioritized list of managers to try for a given package."""
@@ -839,50 +1316,123 @@ def _ordered_install_manager_candidates(pkg: str, installed: Dict[str, bool]) ->
     if _looks_like_npm_pkg(pkg) and installed.get("npm"):
         prefs.append("npm")
     
+    seen = set(prefs)
+    
     # Add system package managers in priority order
-    for manager in _system_manager_priority():
-        if installed.get(manager) and manager not in prefs:
+    for manager in _system_manager_priority(installed):
+        if installed.get(manager) and manager not in seen:
+            seen.add(manager)
             prefs.append(manager)
     
     # Add any remaining installed managers
     for manager, is_installed in installed.items():
-        if is_installed and manager not in prefs:
+        if is_installed and manager not in seen:
+            seen.add(manager)
             prefs.append(manager)
     
     return prefs
 
+# Leading package name of a requirement line, before any specifier/extras/marker
+_PKG_NAME_RE = re.compile(r'[^=<>!~\[;\s]*')
+
+def _pkg_pattern(pkg: str) -> str:
+    """Coarse package family used to key manager success stats.
+    
+    "@types/node" -> "@types/", "python-dateutil" -> "python-", "requests==2.0" -> "requests".
+    """
+    name = _PKG_NAME_RE.match(pkg).group(0).lower()
+    if name.startswith("@") and "/" in name:
+        return name[:name.index("/") + 1]
+    if "-" in name:
+        return name[:name.index("-") + 1]
+    return name
+
+def _score_candidates(pkg: str, candidates: List[str]) -> List[str]:
+    """Order candidates by their recorded success rate for similar packages.
+    
+    Managers without history score 0.5, and the sort is stable, so with no
+    stats the heuristic order from _ordered_install_manager_candidates stands.
+    """
+    try:
+        stats = package_db.attempt_stats(_pkg_pattern(pkg))
+    except sqlite3.Error:
+        stats = {}  # Ranking is best-effort; keep the heuristic order
+    if not stats:
+        return candidates
+    
+    def _score(manager: str) -> float:
+        ok, fail = stats.get(manager, (0, 0))
+        return (ok + 1) / (ok + fail + 2)
+    
+    return sorted(candidates, key=_score, reverse=True)
+
+# Human-readable manager names, built once instead of on every call
+_MANAGER_HUMAN = {
+    "pip": "Python (pip)", "npm": "Node.js (npm)", "apt": "APT", "dnf": "DNF", 
+    "yum": "YUM", "pacman": "Pacman", "zypper": "Zypper", "apk": "APK", 
+    "brew": "Homebrew", "choco": "Chocolatey", "winget": "Winget", 
+    "snap": "Snap", "flatpak": "Flatpak",
+}
+
 def _manager_human(name: str) -> str:
     """Returns a human-readable name for a manager."""
-    names = {
-        "pip": "Python (pip)", "npm": "Node.js (npm)", "apt": "APT", "dnf": "DNF", 
-        "yum": "YUM", "pacman": "Pacman", "zypper": "Zypper", "apk": "APK", 
-        "brew": "Homebrew", "choco": "Chocolatey", "winget": "Winget", 
-        "snap": "Snap", "flatpak": "Flatpak",
-    }
-    return names.get(name, name.title())
+    human = _MANAGER_HUMAN.get(name)
+    return human if human is not None else name.title()
+
+_GENERIC_VERSION_RE = re.compile(r"(\d+\.\d+\.\d+)")
+
+# manager -> (pattern, group holding the version, literal anchor or None).
+# Anchored patterns match a summary line printed at the end of the install,
+# so only the output's tail is searched, and only if it contains the anchor.
+_VERSION_PATTERNS = {
+    # "Successfully installed package-version"
+    "pip": (re.compile(r"Successfully installed .* (\S+)-(\d+\.\d+\.\d+)"), 2, "Successfully installed"),
+    # "package@version"
+    "npm": (re.compile(r"@(\d+\.\d+\.\d+)"), 1, "@"),
+    "apt": (_GENERIC_VERSION_RE, 1, None),
+    "dnf": (_GENERIC_VERSION_RE, 1, None),
+    "yum": (_GENERIC_VERSION_RE, 1, None),
+}
+_VERSION_TAIL_LINES = 12
 
 def _extract_package_version(output: str, manager: str) -> str:
     """Extract version info from installation output."""
-    try:
-        if manager == "pip":
-            # Look for "Successfully installed package-version"
-            match = re.search(r"Successfully installed .* (\S+)-(\d+\.\d+\.\d+)", output)
-            if match:
-                return match.group(2)
-        elif manager == "npm":
-            # Look for version in npm output
-            match = re.search(r"@(\d+\.\d+\.\d+)", output)
-            if match:
-                return match.group(1)
-        elif manager in ["apt", "dnf", "yum"]:
-            # Look for version in package manager output
-            match = re.search(r"(\d+\.\d+\.\d+)", output)
-            if match:
-                return match.group(1)
-    except:
-        pass
+    entry = _VERSION_PATTERNS.get(manager)
+    if entry is not None and output:
+        pattern, group, anchor = entry
+        if anchor is not None:
+            # rsplit with a limit only walks the end of the string
+            output = "\n".join(output.rsplit("\n", _VERSION_TAIL_LINES)[-_VERSION_TAIL_LINES:])
+            if anchor not in output:
+                return "installed"
+        match = pattern.search(output)
+        if match:
+            return match.group(group)
     return "installed"
 
+def _canonical_pkg_name(name: str) -> str:
+    """PEP 503 normalized name, as pip reports it: "Foo_Bar" -> "foo-bar"."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def _batch_package_versions(output: str, manager: str, pkgs: List[str]) -> Dict[str, str]:
+    """Map each package of a batch install to its installed version, or "unknown".
+    
+    Only pip names every package it installed (on its "Successfully installed"
+    line); other managers' summaries can't be split per package.
+    """
+    reported: Dict[str, str] = {}
+    if manager == "pip" and output:
+        for line in output.rsplit("\n", _VERSION_TAIL_LINES)[-_VERSION_TAIL_LINES:]:
+            if line.startswith("Successfully installed "):
+                for item in line.split()[2:]:
+                    name, sep, version = item.rpartition("-")
+                    if sep:
+                        reported[_canonical_pkg_name(name)] = version
+    return {
+        pkg: reported.get(_canonical_pkg_name(_PKG_NAME_RE.match(pkg).group(0)), "unknown")
+        for pkg in pkgs
+    }
+
 # ============================================================================
 # Manager Installation System (Cross-Platform)
 # ============================================================================
@@ -980,6 +1530,7 @@ def install_manager(manager: str) -> bool:
         cprint(f"Installing {_manager_human(manager)}...", "INFO")
         result = run_command(cmd, timeout=900, show_progress=True)
         if result.ok:
+            _invalidate_manager_cache()
             cprint(f"Successfully installed {_manager_human(manager)}", "SUCCESS")
             return True
         else:
@@ -995,8 +1546,36 @@ def install_manager(manager: str) -> bool:
 # Package Installation & Removal
 # ============================================================================
 
-def install_package(pkg: str, preferred_manager: Optional[str] = None) -> Tuple[bool, List[Tuple[str, RunResult]]]:
-    """Install a package using available managers with enhanced progress tracking."""
+_MANAGER_LOCKS: Dict[str, threading.Lock] = {}
+_MANAGER_LOCKS_GUARD = threading.Lock()
+
+def _manager_lock(manager: str) -> threading.Lock:
+    """Per-manager lock so concurrent installs never run one manager twice at once."""
+    with _MANAGER_LOCKS_GUARD:
+        lock = _MANAGER_LOCKS.get(manager)
+        if lock is None:
+            lock = _MANAGER_LOCKS[manager] = threading.Lock()
+        return lock
+
+def _record_attempts(outcomes: Iterable[Tuple[str, str, bool]]):
+    """Feed (pkg, manager, ok) install outcomes back into the stats used by _score_candidates.
+    
+    The stats only rank candidates, so a failed write never fails the install.
+    """
+    try:
+        package_db.record_attempts((_pkg_pattern(pkg), manager, ok) for pkg, manager, ok in outcomes)
+    except sqlite3.Error as e:
+        if LOG.verbose:
+            cprint(f"Could not record install stats: {e}", "WARNING")
+
+def install_package(pkg: str, preferred_manager: Optional[str] = None,
+                    show_progress: bool = True,
+                    db_rows: Optional[List[Tuple[str, str, str, str]]] = None) -> Tuple[bool, List[Tuple[str, RunResult]]]:
+    """Install a package using available managers with enhanced progress tracking.
+    
+    If db_rows is given, the install record is appended to it for the caller
+    to write with package_db.add_packages_batch() instead of being saved here.
+    """
     cprint(f"Preparing to install: {pkg}", "INFO")
     installed = _detect_installed_managers()
     
@@ -1005,7 +1584,7 @@ def install_package(pkg: str, preferred_manager: Optional[str] = None) -> Tuple[
         return (False, [])
     
     attempts: List[Tuple[str, RunResult]] = []
-    candidates = _ordered_install_manager_candidates(pkg, installed)
+    candidates = _score_candidates(pkg, _ordered_install_manager_candidates(pkg, installed))
 
     if preferred_manager:
         pm = preferred_manager.lower()
@@ -1024,25 +1603,33 @@ def install_package(pkg: str, preferred_manager: Optional[str] = None) -> Tuple[
     for i, m in enumerate(candidates, 1):
         cprint(f"  {i}. {_manager_human(m)}", "MUTED")
 
+    handlers = MANAGER_INSTALL_HANDLERS  # local for the per-attempt lookup
     for i, manager in enumerate(candidates, 1):
-        cmd_builder = MANAGER_INSTALL_HANDLERS.get(manager)
+        cmd_builder = handlers.get(manager)
         if not cmd_builder:
             continue
+        label = _manager_human(manager)
             
         try:
             cmd = cmd_builder(pkg)
-            cprint(f"Attempt {i}/{len(candidates)}: Installing via {_manager_human(manager)}...", "INFO")
+            cprint(f"Attempt {i}/{len(candidates)}: Installing via {label}...", "INFO")
             
-            # Use longer timeout for installations with progress tracking
-            res = run_command(cmd, timeout=1800, retries=0, show_progress=True)
+            # Use longer timeout for installations with progress tracking.
+            # Managers like apt/dnf/brew hold a global lock, so serialize per manager.
+            with _manager_lock(manager):
+                res = run_command(cmd, timeout=1800, retries=0, show_progress=show_progress)
             attempts.append((manager, res))
             
             if res.ok:
                 # Extract version and record installation
                 version = _extract_package_version(res.out, manager)
-                package_db.add_package(pkg, version, manager, ' '.join(cmd))
+                if db_rows is not None:
+                    db_rows.append((pkg, version, manager, ' '.join(cmd)))
+                else:
+                    package_db.add_package(pkg, version, manager, ' '.join(cmd))
                 
-                cprint(f"Successfully installed '{pkg}' via {_manager_human(manager)}", "SUCCESS")
+                cprint(f"Successfully installed '{pkg}' via {label}", "SUCCESS")
+                _record_attempts((pkg, m, r.ok) for m, r in attempts)
                 return (True, attempts)
             else:
                 # Show more helpful error messages
@@ -1053,18 +1640,89 @@ def install_package(pkg: str, preferred_manager: Optional[str] = None) -> Tuple[
                     relevant_error = error_lines[-1] if error_lines else "Unknown error"
                     if len(relevant_error) > 180:
                         relevant_error = relevant_error[:177] + "..."
-                    cprint(f"{_manager_human(manager)} failed: {relevant_error}", "WARNING")
+                    cprint(f"{label} failed: {relevant_error}", "WARNING")
                 else:
-                    cprint(f"{_manager_human(manager)} failed with no error message", "WARNING")
+                    cprint(f"{label} failed with no error message", "WARNING")
                     
         except Exception as e:
             err_result = RunResult(False, -1, "", str(e))
             attempts.append((manager, err_result))
-            cprint(f"{_manager_human(manager)} failed with exception: {str(e)}", "WARNING")
+            cprint(f"{label} failed with exception: {str(e)}", "WARNING")
 
     cprint(f"Failed to install '{pkg}' with all available managers.", "ERROR")
+    _record_attempts((pkg, m, r.ok) for m, r in attempts)
     return (False, attempts)
 
+def install_packages(pkgs: List[str], preferred_manager: Optional[str] = None,
+                     progress: Optional[ProgressBar] = None) -> Dict[str, Tuple[bool, List[Tuple[str, RunResult]]]]:
+    """Install several packages with one command per manager where possible.
+    
+    Packages are grouped by their first-choice manager and each group is passed
+    to that manager in a single command, so its resolver runs once. Packages in
+    a failed batch fall back to install_package() one at a time.
+    """
+    installed = _detect_installed_managers()
+    pm = preferred_manager.lower() if preferred_manager else None
+    if pm and not (pm in MANAGER_INSTALL_HANDLERS and installed.get(pm)):
+        pm = None  # install_package() reports the bad --manager on its own
+    
+    groups: Dict[Optional[str], List[str]] = {}
+    for pkg in pkgs:
+        candidates = _score_candidates(pkg, _ordered_install_manager_candidates(pkg, installed))
+        manager = pm or (candidates[0] if candidates else None)
+        if manager in _SINGLE_PACKAGE_MANAGERS:
+            manager = None
+        groups.setdefault(manager, []).append(pkg)
+    
+    db_rows: List[Tuple[str, str, str, str]] = []
+    
+    def _install_one(pkg: str) -> Tuple[bool, List[Tuple[str, RunResult]]]:
+        outcome = install_package(pkg, preferred_manager, show_progress=False, db_rows=db_rows)
+        if progress:
+            progress.update(1)
+        return outcome
+    
+    def _install_group(manager: Optional[str], group: List[str]) -> Dict[str, Tuple[bool, List[Tuple[str, RunResult]]]]:
+        if manager is None or len(group) == 1:
+            return {pkg: _install_one(pkg) for pkg in group}
+        
+        cmd = MANAGER_INSTALL_HANDLERS[manager](*group)
+        cprint(f"Installing {len(group)} packages via {_manager_human(manager)}: {', '.join(group)}", "INFO")
+        with _manager_lock(manager):
+            res = run_command(cmd, timeout=1800, retries=0)
+        
+        if not res.ok:
+            # A batch failure doesn't say which package broke it, so it isn't
+            # counted; the per-package retries record their own outcomes.
+            cprint(f"{_manager_human(manager)} batch install failed, retrying packages one by one", "WARNING")
+            return {pkg: _install_one(pkg) for pkg in group}
+        
+        cmd_str = ' '.join(cmd)
+        versions = _batch_package_versions(res.out, manager, group)
+        db_rows.extend((pkg, versions[pkg], manager, cmd_str) for pkg in group)
+        _record_attempts((pkg, manager, True) for pkg in group)
+        cprint(f"Successfully installed {len(group)} packages via {_manager_human(manager)}", "SUCCESS")
+        if progress:
+            progress.update(len(group))
+        return {pkg: (True, [(manager, res)]) for pkg in group}
+    
+    # One task per manager batch; packages without a batchable manager get a
+    # task each. Different managers don't share a lock, so tasks can overlap.
+    tasks = [(m, g) for m, g in groups.items() if m is not None]
+    tasks += [(None, [pkg]) for pkg in groups.get(None, ())]
+    
+    outcomes: Dict[str, Tuple[bool, List[Tuple[str, RunResult]]]] = {}
+    try:
+        with _fut.ThreadPoolExecutor(max_workers=max(1, min(8, len(tasks)))) as executor:
+            futures = [executor.submit(_install_group, m, g) for m, g in tasks]
+            for future in _fut.as_completed(futures):
+                outcomes.update(future.result())
+    finally:
+        # Record whatever succeeded, in one transaction
+        package_db.add_packages_batch(db_rows)
+    
+    return outcomes
+
 def remove_package(pkg: str, manager: Optional[str] = None) -> Tuple[bool, List[Tuple[str, RunResult]]]:
     """Remove a package using available managers with enhanced UI."""
     cprint(f"Preparing to remove: {pkg}", "INFO")
@@ -1092,14 +1750,16 @@ def remove_package(pkg: str, manager: Optional[str] = None) -> Tuple[bool, List[
         cprint("No package managers available for package removal.", "ERROR")
         return (False, [])
 
+    handlers = MANAGER_REMOVE_HANDLERS  # local for the per-attempt lookup
     for mgr in candidates:
-        cmd_builder = MANAGER_REMOVE_HANDLERS.get(mgr)
+        cmd_builder = handlers.get(mgr)
         if not cmd_builder:
             continue
+        label = _manager_human(mgr)
             
         try:
             cmd = cmd_builder(pkg)
-            cprint(f"Attempting removal via {_manager_human(mgr)}...", "INFO")
+            cprint(f"Attempting removal via {label}...", "INFO")
             
             res = run_command(cmd, timeout=600, retries=0, show_progress=True)
             attempts.append((mgr, res))
@@ -1108,7 +1768,7 @@ def remove_package(pkg: str, manager: Optional[str] = None) -> Tuple[bool, List[
                 # Remove from database
                 package_db.remove_package(pkg, mgr)
                 
-                cprint(f"Removed '{pkg}' via {_manager_human(mgr)}", "SUCCESS")
+                cprint(f"Removed '{pkg}' via {label}", "SUCCESS")
                 return (True, attempts)
             else:
                 err_msg = (res.err or res.out).strip()
@@ -1117,14 +1777,14 @@ def remove_package(pkg: str, manager: Optional[str] = None) -> Tuple[bool, List[
                     relevant_error = error_lines[-1] if error_lines else "Unknown error"
                     if len(relevant_error) > 180:
                         relevant_error = relevant_error[:177] + "..."
-                    cprint(f"{_manager_human(mgr)} failed: {relevant_error}", "WARNING")
+                    cprint(f"{label} failed: {relevant_error}", "WARNING")
                 else:
-                    cprint(f"{_manager_human(mgr)} failed with no error message", "WARNING")
+                    cprint(f"{label} failed with no error message", "WARNING")
                     
         except Exception as e:
             err_result = RunResult(False, -1, "", str(e))
             attempts.append((mgr, err_result))
-            cprint(f"{_manager_human(mgr)} failed with exception: {str(e)}", "WARNING")
+            cprint(f"{label} failed with exception: {str(e)}", "WARNING")
 
     cprint(f"Failed to remove '{pkg}' with all available managers.", "ERROR")
     return (False, attempts)
@@ -1133,81 +1793,71 @@ def remove_package(pkg: str, manager: Optional[str] = None) -> Tuple[bool, List[
 # System Cleanup & Maintenance
 # ============================================================================
 
-def cleanup_system() -> Dict[str, Dict[str, str]]:
-    """Clean up package manager caches and temporary files with progress tracking."""
+def cleanup_system() -> Tuple[bool, Dict[str, Dict[str, str]]]:
+    """Clean up package manager caches and temporary files with progress tracking.
+    
+    Returns (any manager cleaned successfully, per-manager results).
+    """
     cprint("Starting comprehensive system cleanup...", "INFO")
     results = {}
     installed = _detect_installed_managers()
     
-    cleanup_commands = {
-        "pip": [sys.executable, "-m", "pip", "cache", "purge"],
-        "npm": ["npm", "cache", "clean", "--force"],
-        "brew": ["brew", "cleanup", "--prune=all"],
-        "apt": "sudo apt autoremove -y && sudo apt autoclean",
-        "dnf": ["sudo", "dnf", "clean", "all"],
-        "yum": ["sudo", "yum", "clean", "all"],
-        "pacman": ["sudo", "pacman", "-Sc", "--noconfirm"],
-    }
-    
-    available_cleanups = [(mgr, cmd) for mgr, cmd in cleanup_commands.items() if installed.get(mgr)]
+    available_cleanups = [(mgr, cmd) for mgr, cmd in MANAGER_CLEANUP_COMMANDS.items() if installed.get(mgr)]
     
     if not available_cleanups:
         cprint("No package managers found to clean up.", "WARNING")
-        return results
+        return False, results
     
     progress = ProgressBar(len(available_cleanups), "Cleanup progress", "managers")
     
-    for manager, cmd in available_cleanups:
+    def _clean(manager: str, steps: List[List[str]]) -> Tuple[Dict[str, str], str]:
         try:
-            cprint(f"Cleaning {_manager_human(manager)}...", "INFO")
-            use_shell = isinstance(cmd, str)
-            result = run_command(cmd, timeout=300, shell=use_shell)
+            result = _run_sequence(steps, timeout=300)
             
             if result.ok:
-                results[manager] = {"ok": "true", "msg": "Cleanup successful"}
-                cprint(f"{_manager_human(manager)}: Cleanup successful", "SUCCESS")
-            else:
-                results[manager] = {"ok": "false", "msg": result.err or "Cleanup failed"}
-                cprint(f"{_manager_human(manager)}: Cleanup failed", "WARNING")
-                
+                return {"ok": "true", "msg": "Cleanup successful"}, "Cleanup successful"
+            return {"ok": "false", "msg": result.err or "Cleanup failed"}, "Cleanup failed"
         except Exception as e:
-            results[manager] = {"ok": "false", "msg": f"Exception: {e}"}
-            cprint(f"{_manager_human(manager)}: Exception during cleanup: {e}", "WARNING")
-        finally:
+            return {"ok": "false", "msg": f"Exception: {e}"}, f"Exception during cleanup: {e}"
+    
+    # Each manager cleans its own cache, so run them concurrently
+    outcomes = {}
+    successful = 0
+    with _fut.ThreadPoolExecutor(max_workers=min(8, len(available_cleanups))) as executor:
+        future_to_manager = {}
+        for manager, cmd in available_cleanups:
+            cprint(f"Cleaning {_manager_human(manager)}...", "INFO")
+            future_to_manager[executor.submit(_clean, manager, cmd)] = manager
+        for future in _fut.as_completed(future_to_manager):
+            manager = future_to_manager[future]
+            outcomes[manager], message = future.result()
+            ok = outcomes[manager]["ok"] == "true"
+            successful += ok
+            cprint(f"{_manager_human(manager)}: {message}", "SUCCESS" if ok else "WARNING")
             progress.update(1)
     
     progress.finish()
     
-    successful = sum(1 for r in results.values() if r.get("ok") == "true")
+    # Report in detection order regardless of completion order
+    for manager, _ in available_cleanups:
+        results[manager] = outcomes[manager]
+    
     total = len(results)
     cprint(f"Cleanup complete: {successful}/{total} managers cleaned successfully", 
            "SUCCESS" if successful > 0 else "WARNING")
     
-    return results
+    return successful > 0, results
 
-def _update_manager(manager: str) -> Tuple[str, bool, str]:
+def _update_manager(manager: str, show_progress: bool = True) -> Tuple[str, bool, str]:
     """Update a specific package manager."""
     manager = manager.lower()
     
-    update_commands = {
-        "pip": [sys.executable, "-m", "pip", "install", "--upgrade", "pip"],
-        "npm": ["npm", "update", "-g", "npm"],
-        "brew": ["brew", "update", "&&", "brew", "upgrade"],
-        "apt": "sudo apt update && sudo apt upgrade -y",
-        "dnf": ["sudo", "dnf", "update", "-y"],
-        "yum": ["sudo", "yum", "update", "-y"],
-        "pacman": ["sudo", "pacman", "-Syu", "--noconfirm"],
-        "snap": ["sudo", "snap", "refresh"],
-        "flatpak": ["flatpak", "update", "-y"],
-    }
-    
-    cmd = update_commands.get(manager)
-    if not cmd:
+    steps = MANAGER_UPDATE_COMMANDS.get(manager)
+    if not steps:
         return (manager, False, f"Update not supported for {manager}")
     
     try:
-        use_shell = isinstance(cmd, str)
-        result = run_command(cmd, timeout=600, show_progress=True, shell=use_shell)
+        result = _run_sequence(steps, timeout=600, show_progress=show_progress)
         
         if result.ok:
             return (manager, True, "Update successful")
@@ -1216,38 +1866,81 @@ def _update_manager(manager: str) -> Tuple[str, bool, str]:
     except Exception as e:
         return (manager, False, f"Exception: {e}")
 
-def _update_all_managers() -> Dict[str, Dict[str, str]]:
-    """Update all available package managers."""
+def _update_all_managers() -> Tuple[bool, Dict[str, Dict[str, str]]]:
+    """Update all available package managers.
+    
+    Returns (every update succeeded, per-manager results).
+    """
     installed = _detect_installed_managers()
     available_managers = [mgr for mgr, avail in installed.items() if avail]
     
     if not available_managers:
-        return {}
+        return True, {}
     
-    results = {}
+    outcomes = {}
+    all_ok = True
     progress = ProgressBar(len(available_managers), "Updating managers", "managers")
     
-    for manager in available_managers:
-        name, ok, msg = _update_manager(manager)
-        results[name] = {"ok": str(ok).lower(), "msg": msg}
-        
-        status_icon = "Success" if ok else "Failed"
-        cprint(f"{_manager_human(name)}: {msg}", "SUCCESS" if ok else "WARNING")
-        progress.update()
+    # Updates are independent and subprocess-bound, so run them concurrently.
+    # Per-command spinners are disabled; the shared progress bar reports instead.
+    with _fut.ThreadPoolExecutor(max_workers=min(8, len(available_managers))) as executor:
+        futures = [executor.submit(_update_manager, manager, False) for manager in available_managers]
+        for future in _fut.as_completed(futures):
+            name, ok, msg = future.result()
+            outcomes[name] = (ok, msg)
+            all_ok = all_ok and ok
+            
+            cprint(f"{_manager_human(name)}: {msg}", "SUCCESS" if ok else "WARNING")
+            progress.update()
     
     progress.finish()
-    return results
+    
+    # Report in detection order regardless of completion order
+    results = {}
+    for manager in available_managers:
+        ok, msg = outcomes[manager]
+        results[manager] = {"ok": _BOOL_STR[ok], "msg": msg}
+    return all_ok, results
 
 # ============================================================================
 # Real Download & Update System
 # ============================================================================
 
+def _file_sha256(path: Path) -> str:
+    """Compute the SHA256 hex digest of a file on disk."""
+    import hashlib  # Only needed for --sha256 verification
+    
+    with open(path, 'rb') as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+        # file_digest (Python 3.11+) hashes in C and uses OpenSSL's accelerated path
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        # Fallback: hash incrementally through one reused buffer
+        hasher = hashlib.sha256()
+        buf = bytearray(DOWNLOAD_BUFFER_SIZE)
+        view = memoryview(buf)
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            hasher.update(view[:n])
+        return hasher.hexdigest()
+
+def _watch_download(fd: int, progress: ProgressBar, done: threading.Event):
+    """Advance the progress bar to the file's size every 100ms until done is set."""
+    while not done.wait(0.1):
+        progress.update(os.fstat(fd).st_size - progress.current)
+
 def download_file_with_progress(url: str, dest_path: Path, expected_hash: Optional[str] = None) -> bool:
     """Download a file with progress bar and hash verification."""
     try:
         cprint(f"Downloading from: {url}", "INFO")
         
         # Get file info
+        import urllib.request  # Only the network commands pay for this import
         request = urllib.request.Request(url)
         request.add_header('User-Agent', f'CrossFire/{__version__}')
         
@@ -1260,28 +1953,32 @@ def download_file_with_progress(url: str, dest_path: Path, expected_hash: Option
             
             # Setup progress tracking
             progress = ProgressBar(total_size, "Download", "B")
-            downloaded = 0
-            hash_sha256 = hashlib.sha256()
             
             # Create destination directory
             dest_path.parent.mkdir(parents=True, exist_ok=True)
             
+            # copyfileobj keeps per-chunk work out of Python; progress is
+            # sampled from the file size on a side thread instead (it may
+            # trail by one write buffer until the final update below).
+            done = threading.Event()
             with open(dest_path, 'wb') as f:
-                while True:
-                    chunk = response.read(32768)  # 32KB chunks
-                    if not chunk:
-                        break
-                    
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    hash_sha256.update(chunk)
-                    progress.update(len(chunk))
+                watcher = threading.Thread(
+                    target=_watch_download, args=(f.fileno(), progress, done), daemon=True
+                )
+                watcher.start()
+                try:
+                    shutil.copyfileobj(response, f, length=DOWNLOAD_BUFFER_SIZE)
+                finally:
+                    done.set()
+                    watcher.join()
+                downloaded = f.tell()
             
+            progress.update(downloaded - progress.current)
             progress.finish()
             
             # Verify hash if provided
             if expected_hash:
-                actual_hash = hash_sha256.hexdigest()
+                actual_hash = _file_sha256(dest_path)
                 if actual_hash.lower() != expected_hash.lower():
                     cprint(f"Hash verification failed!", "ERROR")
                     cprint(f"Expected: {expected_hash}", "ERROR")
@@ -1300,35 +1997,77 @@ def download_file_with_progress(url: str, dest_path: Path, expected_hash: Option
             dest_path.unlink()
         return False
 
+_NETWORK_FS_TYPES = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "afs", "9p", "ceph", "glusterfs", "fuse.sshfs",
+})
+
+def _is_network_fs(path: Path) -> bool:
+    """Best-effort check whether a path lives on a network filesystem (Linux only)."""
+    try:
+        with open("/proc/mounts") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return False
+    
+    path_str = str(path.resolve())
+    best_mount, best_type = "", ""
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace("\\040", " ")
+        prefix = mount_point.rstrip("/") + "/"
+        if (path_str == mount_point or path_str.startswith(prefix)) and len(mount_point) > len(best_mount):
+            best_mount, best_type = mount_point, fs_type
+    return best_type in _NETWORK_FS_TYPES
+
+def _fsync_file(path: Path):
+    """Flush a file's contents to stable storage."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _backup_file(src: Path, dst: Path):
+    """Keep the current file reachable at dst, via a hardlink when possible."""
+    # os.replace() later gives src a new inode, so a hardlink keeps the old
+    # contents without copying them. Fall back to a copy where links aren't
+    # available (cross-device, FAT, some Windows setups).
+    with contextlib.suppress(FileNotFoundError):
+        dst.unlink()
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
 def cross_update(url: str, verify_sha256: Optional[str] = None) -> bool:
     """Self-update CrossFire from URL with verification."""
     cprint(f"Starting CrossFire self-update...", "INFO")
     
+    # Get current script path
+    current_script = Path(sys.argv[0]).resolve()
+    # Stage the download next to the script so the final swap is an atomic rename
+    staged_file = current_script.with_name(f".{current_script.name}.update")
+    
     try:
-        # Download to temporary file
-        temp_file = CROSSFIRE_CACHE / f"crossfire_update_{int(time.time())}.py"
-        
-        if not download_file_with_progress(url, temp_file, verify_sha256):
+        if not download_file_with_progress(url, staged_file, verify_sha256):
             return False
         
-        # Get current script path
-        current_script = Path(sys.argv[0]).resolve()
-        
         # Create backup
         backup_path = current_script.with_suffix('.py.backup')
         if current_script.exists():
-            shutil.copy2(current_script, backup_path)
+            _backup_file(current_script, backup_path)
             cprint(f"Backup created: {backup_path}", "INFO")
         
-        # Replace current script
-        shutil.copy2(temp_file, current_script)
-        
-        # Make executable on Unix systems
         if OS_NAME != "Windows":
-            current_script.chmod(current_script.stat().st_mode | stat.S_IEXEC)
+            # Make executable on Unix systems
+            staged_file.chmod(staged_file.stat().st_mode | stat.S_IEXEC)
+            # Make sure the new contents are on disk before the rename, so a crash
+            # can't leave a truncated script. Skipped where fsync is slow (Windows,
+            # network mounts).
+            if not _is_network_fs(staged_file):
+                _fsync_file(staged_file)
         
-        # Clean up
-        temp_file.unlink()
+        # Replace current script
+        os.replace(staged_file, current_script)
         
         cprint(f"CrossFire updated successfully!", "SUCCESS")
         cprint(f"Please restart CrossFire to use the new version", "INFO")
@@ -1336,12 +2075,29 @@ def cross_update(url: str, verify_sha256: Optional[str] = None) -> bool:
         
     except Exception as e:
         cprint(f"Update failed: {e}", "ERROR")
+        if staged_file.exists():
+            staged_file.unlink()
         return False
 
 # ============================================================================
 # System Information & Health Check
 # ============================================================================
 
+def _dir_size(path: Path) -> int:
+    """Total size of the files under path, walking it with os.scandir."""
+    total = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                # DirEntry answers type checks from the directory listing itself,
+                # so only regular files cost a stat() call.
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file():
+                    total += entry.stat().st_size
+    return total
+
 def get_system_info() -> Dict[str, Any]:
     """Get comprehensive system information."""
     info = {
@@ -1363,28 +2119,31 @@ def get_system_info() -> Dict[str, Any]:
     
     # Add disk usage
     try:
-        cache_size = sum(f.stat().st_size for f in CROSSFIRE_CACHE.rglob('*') if f.is_file())
+        cache_size = _dir_size(CROSSFIRE_CACHE)
         info["crossfire_data"]["cache_size_mb"] = round(cache_size / 1024 / 1024, 2)
     except:
         info["crossfire_data"]["cache_size_mb"] = 0
     
     return info
 
-def health_check() -> Dict[str, Any]:
-    """Run comprehensive system health check."""
-    cprint("Running system health check...", "INFO")
-    
-    results = {
-        "overall_status": "healthy",
-        "checks": {},
-        "recommendations": []
-    }
-    
-    # Check package managers
+# Status -> (label, color) for the health check report
+_HEALTH_OVERALL_DISPLAY = {
+    "healthy": ("HEALTHY", "SUCCESS"),
+    "needs_attention": ("NEEDS ATTENTION", "WARNING"),
+    "unhealthy": ("UNHEALTHY", "ERROR"),
+}
+_HEALTH_CHECK_DISPLAY = {
+    "good": ("Good", "SUCCESS"),
+    "warning": ("Warning", "WARNING"),
+    "error": ("Error", "ERROR"),
+    "unknown": ("Unknown", "INFO"),
+}
+
+def _check_package_managers() -> Tuple[Dict[str, Any], List[str]]:
     managers = _detect_installed_managers()
     manager_count = sum(1 for available in managers.values() if available)
     
-    results["checks"]["package_managers"] = {
+    check = {
         "status": "good" if manager_count >= 2 else "warning" if manager_count >= 1 else "error",
         "available_count": manager_count,
         "total_supported": len(managers),
@@ -1392,60 +2151,94 @@ def health_check() -> Dict[str, Any]:
     }
     
     if manager_count == 0:
-        results["recommendations"].append("Install at least one package manager (pip, npm, brew, apt, etc.)")
-        results["overall_status"] = "unhealthy"
+        return check, ["Install at least one package manager (pip, npm, brew, apt, etc.)"]
     elif manager_count == 1:
-        results["recommendations"].append("Consider installing additional package managers for better coverage")
+        return check, ["Consider installing additional package managers for better coverage"]
+    return check, []
+
+# Resolved through DNS (IPv4 or IPv6); a bare TCP connect to HTTPS proves reachability
+_INTERNET_PROBE_HOSTS = (("google.com", 443), ("pypi.org", 443))
+
+def _check_internet() -> Tuple[Dict[str, Any], List[str]]:
+    for address in _INTERNET_PROBE_HOSTS:
+        try:
+            with socket.create_connection(address, timeout=2):
+                return {"status": "good", "message": "Internet connection available"}, []
+        except OSError:
+            continue
     
-    # Check network connectivity
+    # Direct connections may be blocked behind a proxy; urllib honours *_proxy settings
     try:
-        urllib.request.urlopen("https://google.com", timeout=10)
-        results["checks"]["internet"] = {"status": "good", "message": "Internet connection available"}
-    except:
-        results["checks"]["internet"] = {"status": "error", "message": "No internet connection"}
-        results["recommendations"].append("Check your internet connection")
-        results["overall_status"] = "unhealthy"
-    
-    # Check CrossFire database
+        import urllib.request  # Only needed when the direct probes fail
+        probe = urllib.request.Request("https://google.com", method="HEAD")
+        with urllib.request.urlopen(probe, timeout=10):
+            pass
+        return {"status": "good", "message": "Internet connection available"}, []
+    except Exception:
+        return {"status": "error", "message": "No internet connection"}, ["Check your internet connection"]
+
+def _check_database() -> Tuple[Dict[str, Any], List[str]]:
     try:
         installed_packages = package_db.get_installed_packages()
-        results["checks"]["database"] = {
+        return {
             "status": "good",
             "installed_packages": len(installed_packages),
             "database_path": str(CROSSFIRE_DB)
-        }
+        }, []
     except Exception as e:
-        results["checks"]["database"] = {
+        return {
             "status": "error", 
             "message": f"Database error: {e}"
-        }
-        results["recommendations"].append("Database may be corrupted - consider clearing CrossFire data")
-    
-    # Check disk space
+        }, ["Database may be corrupted - consider clearing CrossFire data"]
+
+def _check_disk_space() -> Tuple[Dict[str, Any], List[str]]:
     try:
         free_space = shutil.disk_usage(CROSSFIRE_DIR).free
         free_space_gb = free_space / (1024**3)
         
         if free_space_gb < 0.1:  # Less than 100MB
-            results["checks"]["disk_space"] = {
+            return {
                 "status": "error",
                 "free_space_gb": round(free_space_gb, 2)
-            }
-            results["recommendations"].append("Very low disk space - clean up files")
-            results["overall_status"] = "unhealthy"
+            }, ["Very low disk space - clean up files"]
         elif free_space_gb < 1:  # Less than 1GB
-            results["checks"]["disk_space"] = {
+            return {
                 "status": "warning",
                 "free_space_gb": round(free_space_gb, 2)
-            }
-            results["recommendations"].append("Low disk space - consider cleanup")
-        else:
-            results["checks"]["disk_space"] = {
-                "status": "good",
-                "free_space_gb": round(free_space_gb, 2)
-            }
+            }, ["Low disk space - consider cleanup"]
+        return {
+            "status": "good",
+            "free_space_gb": round(free_space_gb, 2)
+        }, []
     except:
-        results["checks"]["disk_space"] = {"status": "unknown", "message": "Could not check disk space"}
+        return {"status": "unknown", "message": "Could not check disk space"}, []
+
+# Check name -> probe, in report order
+_HEALTH_CHECKS = (
+    ("package_managers", _check_package_managers),
+    ("internet", _check_internet),
+    ("database", _check_database),
+    ("disk_space", _check_disk_space),
+)
+
+def health_check() -> Dict[str, Any]:
+    """Run comprehensive system health check."""
+    cprint("Running system health check...", "INFO")
+    
+    results = {
+        "overall_status": "healthy",
+        "checks": {},
+        "recommendations": []
+    }
+    
+    # The probes are independent (the network one can block for seconds), so
+    # run them together and assemble the report in a fixed order.
+    with _fut.ThreadPoolExecutor(max_workers=len(_HEALTH_CHECKS)) as executor:
+        futures = [(name, executor.submit(probe)) for name, probe in _HEALTH_CHECKS]
+        for name, future in futures:
+            check, recommendations = future.result()
+            results["checks"][name] = check
+            results["recommendations"].extend(recommendations)
     
     # Set final status
     if any(check.get("status") == "error" for check in results["checks"].values()):
@@ -1455,22 +2248,19 @@ def health_check() -> Dict[str, Any]:
     
     # Display results
     if not LOG.json_mode:
-        status_colors = {"healthy": "SUCCESS", "needs_attention": "WARNING", "unhealthy": "ERROR"}
-        status_icons = {"healthy": "Healthy", "needs_attention": "Needs Attention", "unhealthy": "Unhealthy"}
-        
-        overall_status = results["overall_status"]
-        cprint(f"Overall Status: {status_icons[overall_status].upper()}", status_colors[overall_status])
-        
-        for check_name, check_result in results["checks"].items():
-            status = check_result.get("status", "unknown")
-            icon = {"good": "Good", "warning": "Warning", "error": "Error", "unknown": "Unknown"}[status]
-            cprint(f"  {check_name.replace('_', ' ').title()}: {icon}", 
-                   {"good": "SUCCESS", "warning": "WARNING", "error": "ERROR", "unknown": "INFO"}[status])
-        
-        if results["recommendations"]:
-            cprint("\nRecommendations:", "CYAN")
-            for i, rec in enumerate(results["recommendations"], 1):
-                cprint(f"  {i}. {rec}", "INFO")
+        with LOG.batched():
+            overall_status = results["overall_status"]
+            label, color = _HEALTH_OVERALL_DISPLAY[overall_status]
+            cprint(f"Overall Status: {label}", color)
+            
+            for check_name, check_result in results["checks"].items():
+                label, color = _HEALTH_CHECK_DISPLAY[check_result.get("status", "unknown")]
+                cprint(f"  {check_name.replace('_', ' ').title()}: {label}", color)
+            
+            if results["recommendations"]:
+                cprint("\nRecommendations:", "CYAN")
+                for i, rec in enumerate(results["recommendations"], 1):
+                    cprint(f"  {i}. {rec}", "INFO")
     
     return results
 
@@ -1478,6 +2268,48 @@ def health_check() -> Dict[str, Any]:
 # Setup and Installation
 # ============================================================================
 
+_PATH_ASSIGN_RE = re.compile(r'^\s*(?:export\s+)?PATH=["\']?([^"\'\n]+)')
+
+def _rc_path_entries(lines: Iterable[str]) -> set:
+    """Collect the directories shell rc lines put on PATH, with $HOME/~ expanded."""
+    home = str(Path.home())
+    entries = set()
+    for line in lines:
+        if "PATH=" not in line:
+            continue
+        match = _PATH_ASSIGN_RE.match(line)
+        if match:
+            value = match.group(1).replace("${HOME}", home).replace("$HOME", home)
+            entries.update(os.path.expanduser(p).rstrip("/") for p in value.split(":"))
+    return entries
+
+def _update_rc(config_file: Path, path_entry: str) -> Optional[Tuple[str, str]]:
+    """Append a PATH export to one rc file unless it already has the entry.
+    
+    Check and append share one O_APPEND descriptor. Returns a (message, level)
+    to report, or None if the file doesn't exist or needs no change.
+    """
+    try:
+        fd = os.open(config_file, os.O_RDWR | os.O_APPEND)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        return f"Could not update {config_file.name}: {e}", "WARNING"
+    
+    try:
+        # Check if already added, in any quoting or order
+        with open(fd, 'r', errors='replace', closefd=False) as f:
+            if path_entry.rstrip("/") in _rc_path_entries(f):
+                return None
+        
+        # Add PATH export
+        os.write(fd, f'\n# Added by CrossFire\nexport PATH="{path_entry}:$PATH"\n'.encode())
+        return f"Updated {config_file.name}", "SUCCESS"
+    except Exception as e:
+        return f"Could not update {config_file.name}: {e}", "WARNING"
+    finally:
+        os.close(fd)
+
 def add_to_path_safely() -> bool:
     """Add CrossFire to PATH safely across different shells and platforms."""
     cprint("Adding CrossFire to PATH...", "INFO")
@@ -1504,23 +2336,14 @@ def add_to_path_safely() -> bool:
         
         path_entry = str(install_dir)
         
-        for config_file in shell_configs:
-            if config_file.exists():
-                try:
-                    # Read current content
-                    content = config_file.read_text()
-                    
-                    # Check if already added
-                    if f'export PATH="{path_entry}:$PATH"' in content:
-                        continue
-                    
-                    # Add PATH export
-                    with config_file.open('a') as f:
-                        f.write(f'\n# Added by CrossFire\nexport PATH="{path_entry}:$PATH"\n')
-                    
-                    cprint(f"Updated {config_file.name}", "SUCCESS")
-                except Exception as e:
-                    cprint(f"Could not update {config_file.name}: {e}", "WARNING")
+        # The rc files are independent; check and update them concurrently,
+        # then report in a fixed order
+        if shell_configs:
+            with _fut.ThreadPoolExecutor(max_workers=len(shell_configs)) as executor:
+                outcomes = list(executor.map(lambda p: _update_rc(p, path_entry), shell_configs))
+            for outcome in outcomes:
+                if outcome is not None:
+                    cprint(*outcome)
         
         return True
         
@@ -1545,12 +2368,28 @@ def install_launcher(target_dir: Optional[str] = None) -> Optional[str]:
         launcher_name = "crossfire.exe" if OS_NAME == "Windows" else "crossfire"
         launcher_path = install_dir / launcher_name
 
-        # Copy current script
+        # A hardlink shares the script's mode, so only link a script that is
+        # already executable; otherwise copy it and chmod the copy.
         current_script = Path(__file__).resolve()
-        shutil.copy2(current_script, launcher_path)
-
-        if OS_NAME != "Windows":
-            launcher_path.chmod(launcher_path.stat().st_mode | stat.S_IEXEC)
+        executable = OS_NAME == "Windows" or current_script.stat().st_mode & 0o111 == 0o111
+        if not (executable and launcher_path.exists() and os.path.samefile(current_script, launcher_path)):
+            # Build the new launcher beside the old one and swap it in, so a
+            # failed copy leaves the previous launcher in place
+            tmp_path = launcher_path.with_name(f".{launcher_name}.{os.getpid()}.tmp")
+            try:
+                linked = False
+                if executable:
+                    with contextlib.suppress(OSError):
+                        os.link(current_script, tmp_path)
+                        linked = True
+                if not linked:
+                    shutil.copyfile(current_script, tmp_path)
+                    if OS_NAME != "Windows":
+                        os.chmod(tmp_path, 0o755)
+                os.replace(tmp_path, launcher_path)
+            finally:
+                with contextlib.suppress(FileNotFoundError):
+                    tmp_path.unlink()
 
         cprint(f"Launcher installed to: {launcher_path}", "SUCCESS")
         return str(launcher_path)
@@ -1597,43 +2436,29 @@ def install_launcher(target_dir: Optional[str] = None) -> Optional[str]:
 def list_managers_status() -> Dict[str, str]:
     """Get status of all package managers."""
     installed = _detect_installed_managers()
-    status = {}
-    for manager in MANAGER_INSTALL_HANDLERS.keys():
-        if manager in installed and installed[manager]:
-            status[manager] = "Installed"
-        else:
-            status[manager] = "Not Installed"
-    return status
+    return {m: ("Installed" if installed.get(m) else "Not Installed") for m in _SUPPORTED_MANAGERS}
 
 def show_installed_packages():
     """Show packages installed via CrossFire."""
-    packages = package_db.get_installed_packages()
-    
     if LOG.json_mode:
-        print(json.dumps(packages, indent=2, default=str))
+        emit_json(package_db.get_installed_packages())
         return
     
-    if not packages:
+    # SQLite returns the rows grouped by manager and sorted within each group
+    groups = list(package_db.iter_grouped_by_manager())
+    
+    if not groups:
         cprint("No packages have been installed via CrossFire yet.", "INFO")
         cprint("Packages installed directly via other managers won't appear here.", "MUTED")
         return
     
-    cprint(f"Packages Installed via CrossFire ({len(packages)})", "SUCCESS")
+    cprint(f"Packages Installed via CrossFire ({sum(len(pkgs) for _, pkgs in groups)})", "SUCCESS")
     cprint("=" * 70, "CYAN")
     
-    # Group by manager
-    by_manager = {}
-    for pkg in packages:
-        manager = pkg['manager']
-        if manager not in by_manager:
-            by_manager[manager] = []
-        by_manager[manager].append(pkg)
-    
-    for manager in sorted(by_manager.keys()):
-        pkgs = by_manager[manager]
+    for manager, pkgs in groups:
         cprint(f"\n{_manager_human(manager)} ({len(pkgs)} packages)", "INFO")
         
-        for i, pkg in enumerate(sorted(pkgs, key=lambda x: x['install_date'], reverse=True), 1):
+        for i, pkg in enumerate(pkgs, 1):
             install_date = pkg['install_date'][:10] if pkg['install_date'] else 'unknown'  # Just date part
             version = pkg.get('version', 'unknown')
             
@@ -1643,47 +2468,34 @@ def show_installed_packages():
     
     cprint(f"\nRemove with: crossfire -r <package_name>", "INFO")
 
-def get_package_statistics() -> Dict[str, Any]:
-    """Get detailed package statistics."""
-    packages = package_db.get_installed_packages()
-    managers = _detect_installed_managers()
-    
-    stats = {
-        "total_packages": len(packages),
-        "packages_by_manager": {},
-        "recent_installations": [],
+def get_package_statistics(by_manager: Optional[Dict[str, int]] = None,
+                           managers: Optional[Dict[str, bool]] = None) -> Dict[str, Any]:
+    """Get detailed package statistics.
+    
+    Callers that already hold per-manager counts or detection results can pass
+    them in; only what's missing is fetched.
+    """
+    if by_manager is None:
+        by_manager = package_db.count_by_manager()
+    if managers is None:
+        managers = _detect_installed_managers()
+    
+    # Grouping and the date filter run in SQLite, not over every row in Python
+    return {
+        "total_packages": sum(by_manager.values()),
+        "packages_by_manager": by_manager,
+        "recent_installations": package_db.recent_installations(datetime.now() - timedelta(days=7)),
         "available_managers": sum(1 for avail in managers.values() if avail),
         "total_supported_managers": len(managers)
     }
-    
-    # Group by manager
-    for pkg in packages:
-        manager = pkg['manager']
-        stats["packages_by_manager"][manager] = stats["packages_by_manager"].get(manager, 0) + 1
-    
-    # Recent installations (last 7 days)
-    try:
-        week_ago = datetime.now() - timedelta(days=7)
-        for pkg in packages:
-            if pkg['install_date']:
-                install_date = datetime.fromisoformat(pkg['install_date'].replace('Z', '+00:00'))
-                if install_date > week_ago:
-                    stats["recent_installations"].append({
-                        "name": pkg['name'],
-                        "manager": pkg['manager'],
-                        "date": pkg['install_date']
-                    })
-    except:
-        pass  # Handle date parsing errors gracefully
-    
-    return stats
 
-def show_statistics():
-    """Display detailed CrossFire statistics."""
-    stats = get_package_statistics()
+def show_statistics(stats: Optional[Dict[str, Any]] = None):
+    """Display detailed CrossFire statistics (from `stats` if already computed)."""
+    if stats is None:
+        stats = get_package_statistics()
     
     if LOG.json_mode:
-        print(json.dumps(stats, indent=2, default=str))
+        emit_json(stats)
         return
     
     cprint(f"CrossFire Statistics", "SUCCESS")
@@ -1713,6 +2525,20 @@ def show_statistics():
         if len(stats["recent_installations"]) > 5:
             cprint(f"  ... and {len(stats['recent_installations']) - 5} more", "MUTED")
 
+def _iter_pkg_lines(path: Path) -> Iterable[str]:
+    """Yield the non-empty, non-comment lines of a requirements file, stripped."""
+    with path.open('rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return
+        with mm:
+            for raw in iter(mm.readline, b""):
+                # One strip per line; indented comments are caught after it
+                raw = raw.strip()
+                if raw and raw[0] != 0x23:  # '#'
+                    yield raw.decode()
+
 def bulk_install_from_file(file_path: str) -> Dict[str, Any]:
     """Install packages from a requirements file."""
     cprint(f"Installing packages from: {file_path}", "INFO")
@@ -1723,9 +2549,8 @@ def bulk_install_from_file(file_path: str) -> Dict[str, Any]:
             cprint(f"File not found: {file_path}", "ERROR")
             return {"success": False, "error": "File not found"}
         
-        content = path.read_text().strip()
-        lines = [line.strip() for line in content.splitlines() 
-                if line.strip() and not line.startswith('#')]
+        # Drop repeated entries (e.g. from concatenated files), keeping order.
+        lines = list(dict.fromkeys(_iter_pkg_lines(path)))
         
         if not lines:
             cprint("No packages found in file", "WARNING")
@@ -1741,13 +2566,11 @@ def bulk_install_from_file(file_path: str) -> Dict[str, Any]:
         }
         
         progress = ProgressBar(len(lines), "Installing packages", "packages")
+        outcomes = install_packages(lines, progress=progress)
+        progress.finish()
         
         for line in lines:
-            # Parse package name (handle version specifiers)
-            pkg_name = re.split(r'[=<>!]', line)[0].strip()
-            
-            cprint(f"Installing {pkg_name}...", "INFO")
-            success, attempts = install_package(line)
+            success, attempts = outcomes[line]
             
             result = {
                 "package": line,
@@ -1760,15 +2583,12 @@ def bulk_install_from_file(file_path: str) -> Dict[str, Any]:
                 results["successful"] += 1
             else:
                 results["failed"] += 1
-            
-            progress.update(1)
-        
-        progress.finish()
         
         # Summary
-        cprint(f"\nInstallation Summary:", "CYAN")
-        cprint(f"  Successful: {results['successful']}/{results['total_packages']}", "SUCCESS")
-        cprint(f"  Failed: {results['failed']}/{results['total_packages']}", "ERROR" if results['failed'] > 0 else "SUCCESS")
+        with LOG.batched():
+            cprint(f"\nInstallation Summary:", "CYAN")
+            cprint(f"  Successful: {results['successful']}/{results['total_packages']}", "SUCCESS")
+            cprint(f"  Failed: {results['failed']}/{results['total_packages']}", "ERROR" if results['failed'] > 0 else "SUCCESS")
         
         return results
         
@@ -1781,22 +2601,13 @@ def export_packages(manager: str, output_file: Optional[str] = None) -> bool:
     cprint(f"Exporting packages from {_manager_human(manager)}...", "INFO")
     
     try:
-        packages = package_db.get_installed_packages(manager)
+        # Rows come back from SQLite already sorted by name
+        rows = package_db.get_names_versions(manager)
         
-        if not packages:
+        if not rows:
             cprint(f"No packages installed via {_manager_human(manager)} found in CrossFire database", "WARNING")
             return False
         
-        # Generate requirements content
-        lines = []
-        for pkg in sorted(packages, key=lambda x: x['name']):
-            if pkg['version'] and pkg['version'] != 'unknown':
-                lines.append(f"{pkg['name']}=={pkg['version']}")
-            else:
-                lines.append(pkg['name'])
-        
-        content = '\n'.join(lines) + '\n'
-        
         # Determine output file
         if output_file:
             out_path = Path(output_file)
@@ -1805,9 +2616,14 @@ def export_packages(manager: str, output_file: Optional[str] = None) -> bool:
             out_path = Path(f"crossfire_{manager}_requirements_{timestamp}.txt")
         
         # Write file
-        out_path.write_text(content)
+        with out_path.open('w', buffering=1 << 16) as f:
+            for name, version in rows:
+                if version and version != 'unknown':
+                    f.write(f"{name}=={version}\n")
+                else:
+                    f.write(f"{name}\n")
         
-        cprint(f"Exported {len(packages)} packages to: {out_path}", "SUCCESS")
+        cprint(f"Exported {len(rows)} packages to: {out_path}", "SUCCESS")
         cprint(f"Install with: crossfire --install-from {out_path}", "INFO")
         
         return True
@@ -1820,12 +2636,18 @@ def export_packages(manager: str, output_file: Optional[str] = None) -> bool:
 # Enhanced CLI Interface
 # ============================================================================
 
-def create_parser() -> argparse.ArgumentParser:
-    """Creates the enhanced command-line argument parser."""
-    parser = argparse.ArgumentParser(
-        description="CrossFire — Production Universal Package Manager CLI",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+def _manager_arg(value: str) -> str:
+    """argparse type for --update-manager: a known manager name (any case) or 'ALL'."""
+    target = value.upper()
+    if target == "ALL":
+        return target
+    try:
+        return _MANAGER_BY_UPPER[target]
+    except KeyError:
+        raise argparse.ArgumentTypeError(f"unknown package manager: {value}") from None
+
+# Static help text; a module constant so create_parser() only references it
+_PARSER_EPILOG = """
 Commands:
   General:
     --version                   Show CrossFire version
@@ -1876,7 +2698,15 @@ Examples:
   crossfire --health-check
   crossfire --speed-test
   crossfire --change-install-location ~/mybin
-        """,
+        """
+
+@functools.lru_cache(maxsize=1)
+def create_parser() -> argparse.ArgumentParser:
+    """Creates the enhanced command-line argument parser (built once per process)."""
+    parser = argparse.ArgumentParser(
+        description="CrossFire — Production Universal Package Manager CLI",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=_PARSER_EPILOG,
     )
 
     parser.add_argument("--version", action="version", version=f"CrossFire {__version__}")
@@ -1899,7 +2729,7 @@ Examples:
     parser.add_argument("-o", "--output", metavar="FILE", help="Output file for export command")
     
     # System management
-    parser.add_argument("-um", "--update-manager", metavar="NAME", help="Update specific manager or 'ALL'")
+    parser.add_argument("-um", "--update-manager", type=_manager_arg, metavar="NAME", help="Update specific manager or 'ALL'")
     parser.add_argument("-cu", "--crossupdate", nargs="?", const=DEFAULT_UPDATE_URL, metavar="URL",
                          help="Self-update from URL (default: GitHub)")
     parser.add_argument("--sha256", metavar="HASH", help="Expected SHA256 hash for update verification")
@@ -1931,14 +2761,8 @@ Examples:
 
 def show_enhanced_status() -> int:
     """Shows the enhanced tool status with better formatting."""
-    # Welcome header
-    cprint("=" * 60, "CYAN")
-    cprint(f"{__version__}", "SUCCESS")
-    cprint(f"System: {OS_NAME} {DISTRO_NAME} {DISTRO_VERSION} ({ARCH})", "INFO")
-    cprint("=" * 60, "CYAN")
-    
     status_info = list_managers_status()
-
+    
     if LOG.json_mode:
         output = {
             "version": __version__,
@@ -1947,57 +2771,288 @@ def show_enhanced_status() -> int:
             "distro_version": DISTRO_VERSION,
             "arch": ARCH,
             "managers": status_info,
-            "crossfire_packages": len(package_db.get_installed_packages())
+            "crossfire_packages": package_db.count_installed()
         }
-        print(json.dumps(output, indent=2, ensure_ascii=False))
+        emit_json(output)
+        return 0
+    
+    # Welcome header
+    cprint("=" * 60, "CYAN")
+    cprint(f"{__version__}", "SUCCESS")
+    cprint(f"System: {OS_NAME} {DISTRO_NAME} {DISTRO_VERSION} ({ARCH})", "INFO")
+    cprint("=" * 60, "CYAN")
+    
+    installed_managers, not_installed = [], []
+    for m, s in status_info.items():
+        if s == "Installed":
+            installed_managers.append(m)
+        else:
+            not_installed.append((m, s))
+    installed_managers.sort()
+    not_installed.sort()
+    
+    cprint(f"\nAvailable Package Managers ({len(installed_managers)}):", "SUCCESS")
+    if installed_managers:
+        for i, manager in enumerate(installed_managers, 1):
+            cprint(f"  {i:2d}. {_manager_human(manager)}", "SUCCESS")
+    else:
+        cprint("      None found - consider installing pip, npm, brew, or apt", "WARNING")
+    
+    # Show CrossFire-managed packages (count + 3 most recent; the rest isn't loaded)
+    n_packages = package_db.count_installed()
+    cprint(f"\nCrossFire-Managed Packages: {n_packages}", "INFO")
+    if n_packages:
+        for pkg in package_db.get_recent_installed(3):
+            cprint(f"  • {pkg['name']} via {_manager_human(pkg['manager'])}", "SUCCESS")
+        if n_packages > 3:
+            cprint(f"  ... and {n_packages - 3} more", "MUTED")
+        cprint(f"  Use: crossfire --list-installed to see all", "INFO")
+        
+    if not_installed and LOG.verbose:
+        cprint(f"\nUnavailable Managers:", "MUTED")
+        for manager, status in not_installed[:5]: # Show only first 5
+            cprint(f"      ○ {manager} ({status})", "MUTED")
+        if len(not_installed) > 5:
+            cprint(f"      ... and {len(not_installed) - 5} more", "MUTED")
+    
+    cprint("\nQuick Start:", "CYAN")
+    cprint("    crossfire --setup              # Install CrossFire globally", "INFO")
+    cprint("    crossfire -s 'python library'  # Real search across repositories", "INFO") 
+    cprint("    crossfire -i numpy             # Install with automatic tracking", "INFO")
+    cprint("    crossfire --install-manager brew  # Install package managers", "INFO")
+    cprint("    crossfire --list-installed     # Show managed packages", "INFO")
+    cprint("    crossfire --health-check       # System diagnostics", "INFO")
+    cprint("    crossfire --help               # Show all commands", "INFO")
+    
+    if installed_managers:
+        cprint(f"\nSystem Ready! Found {len(installed_managers)} package managers.", "SUCCESS")
+    else:
+        cprint(f"\nSetup Needed - No package managers detected.", "WARNING")
+    
+    return 0
+
+def _handle_setup(args) -> int:
+    cprint("Running production setup...", "INFO")
+    
+    path_success = add_to_path_safely()
+    installed_path = install_launcher()
+    
+    if installed_path and path_success:
+        cprint(f"\nSetup Complete!", "SUCCESS")
+        cprint("    • CrossFire is now available globally as 'crossfire'", "SUCCESS")
+        cprint("    • Restart your terminal or run: source ~/.bashrc", "INFO")
+        cprint("    • Try: crossfire -s 'python library' to test search", "CYAN")
+        cprint("    • Database initialized for package tracking", "INFO")
+    else:
+        cprint("Setup completed with some issues.", "WARNING")
+    return 0
+
+def _handle_install_manager(args) -> int:
+    manager = args.install_manager.lower()
+    success = install_manager(manager)
+    if LOG.json_mode:
+        emit_json({"manager": manager, "success": success})
+    return 0 if success else 1
+
+def _handle_speed_test(args) -> int:
+    test_url = args.test_url
+    duration = args.test_duration
+    result = SpeedTest.test_download_speed(test_url, duration)
+    if LOG.json_mode:
+        emit_json(result)
+    return 0 if result.get("ok") else 1
+
+def _handle_ping_test(args) -> int:
+    result = SpeedTest.ping_test()
+    if LOG.json_mode:
+        emit_json(result)
+    return 0
+
+def _handle_crossupdate(args) -> int:
+    url = args.crossupdate or DEFAULT_UPDATE_URL
+    success = cross_update(url, verify_sha256=args.sha256)
+    return 0 if success else 1
+
+def _handle_update_manager(args) -> int:
+    # Already validated and case-normalized by _manager_arg
+    target = args.update_manager
+    if target == "ALL":
+        ok, results = _update_all_managers()
     else:
-        installed_managers = sorted([m for m, s in status_info.items() if s == "Installed"])
-        not_installed = sorted([m for m, s in status_info.items() if s != "Installed"])
+        name, ok, msg = _update_manager(target)
+        results = {name: {"ok": _BOOL_STR[ok], "msg": msg}}
+        cprint(f"{name}: {msg}", "SUCCESS" if ok else "ERROR")
         
-        cprint(f"\nAvailable Package Managers ({len(installed_managers)}):", "SUCCESS")
-        if installed_managers:
-            for i, manager in enumerate(installed_managers, 1):
-                cprint(f"  {i:2d}. {_manager_human(manager)}", "SUCCESS")
-        else:
-            cprint("      None found - consider installing pip, npm, brew, or apt", "WARNING")
-        
-        # Show CrossFire-managed packages
-        crossfire_packages = package_db.get_installed_packages()
-        cprint(f"\nCrossFire-Managed Packages: {len(crossfire_packages)}", "INFO")
-        if crossfire_packages:
-            recent = crossfire_packages[:3]  # Show 3 most recent
-            for pkg in recent:
-                cprint(f"  • {pkg['name']} via {_manager_human(pkg['manager'])}", "SUCCESS")
-            if len(crossfire_packages) > 3:
-                cprint(f"  ... and {len(crossfire_packages) - 3} more", "MUTED")
-            cprint(f"  Use: crossfire --list-installed to see all", "INFO")
-            
-        if not_installed and LOG.verbose:
-            cprint(f"\nUnavailable Managers:", "MUTED")
-            for manager in not_installed[:5]: # Show only first 5
-                status = status_info[manager]
-                cprint(f"      ○ {manager} ({status})", "MUTED")
-            if len(not_installed) > 5:
-                cprint(f"      ... and {len(not_installed) - 5} more", "MUTED")
-        
-        cprint("\nQuick Start:", "CYAN")
-        cprint("    crossfire --setup              # Install CrossFire globally", "INFO")
-        cprint("    crossfire -s 'python library'  # Real search across repositories", "INFO") 
-        cprint("    crossfire -i numpy             # Install with automatic tracking", "INFO")
-        cprint("    crossfire --install-manager brew  # Install package managers", "INFO")
-        cprint("    crossfire --list-installed     # Show managed packages", "INFO")
-        cprint("    crossfire --health-check       # System diagnostics", "INFO")
-        cprint("    crossfire --help               # Show all commands", "INFO")
-        
-        if installed_managers:
-            cprint(f"\nSystem Ready! Found {len(installed_managers)} package managers.", "SUCCESS")
-        else:
-            cprint(f"\nSetup Needed - No package managers detected.", "WARNING")
+    if LOG.json_mode:
+        emit_json(results)
+    return 0 if ok else 1
+
+_MANAGER_STATUS_COLORS = {"Installed": "SUCCESS", "Not Installed": "MUTED"}
+
+def _handle_list_managers(args) -> int:
+    status_info = list_managers_status()
+    if LOG.json_mode:
+        emit_json(status_info)
+    else:
+        with LOG.batched():
+            cprint("Package Manager Status:", "INFO")
+            for manager, status in sorted(status_info.items()):
+                cprint(f" {manager}: {status}", _MANAGER_STATUS_COLORS.get(status, "WARNING"))
+                
+            cprint(f"\nInstall managers with: crossfire --install-manager <name>", "INFO")
+    return 0
+
+def _handle_list_installed(args) -> int:
+    # One write for the whole report instead of one per package line
+    with LOG.batched():
+        show_installed_packages()
+    return 0
+
+def _handle_stats(args) -> int:
+    with LOG.batched():
+        show_statistics()
+    return 0
+
+def _handle_health_check(args) -> int:
+    results = health_check()
+    if LOG.json_mode:
+        emit_json(results)
+    return 0 if results["overall_status"] == "healthy" else 1
+
+# Relevance indicator strings, indexed by star count
+_STAR_TABLE = tuple("⭐" * n for n in range(6))
+
+def _handle_search(args) -> int:
+    query = args.search
+    results = get_search_engine().search(query, args.manager, args.search_limit)
+    n_results = len(results)
     
+    if LOG.json_mode:
+        output = {
+            "query": query, 
+            "results": [r.to_dict() for r in results],
+            "total_found": n_results
+        }
+        emit_json(output)
+    else:
+        if not results:
+            cprint(f"No packages found for '{query}'", "WARNING")
+            cprint("Try different keywords or check internet connection", "INFO")
+            return 1
+        
+        with LOG.batched():
+            cprint(f"Search Results for '{query}' (Found {n_results})", "SUCCESS")
+            cprint("=" * 70, "CYAN")
+            
+            human = _manager_human
+            for i, pkg in enumerate(results, 1):
+                # Relevance indicator
+                stars = int(pkg.relevance_score // 20)
+                relevance_stars = _STAR_TABLE[5 if stars > 5 else 1 if stars < 1 else stars]
+                
+                cprint(f"\n{i:2d}. {pkg.name} ({human(pkg.manager)}) {relevance_stars}", "SUCCESS")
+                if pkg.version:
+                    cprint(f"      Version: {pkg.version}", "INFO")
+                desc = pkg.description
+                if desc:
+                    if len(desc) > 120:
+                        desc = desc[:120] + "..."
+                    cprint(f"      {desc}", "MUTED")
+                if pkg.homepage:
+                    cprint(f"      {pkg.homepage}", "CYAN")
+            
+            cprint(f"\nInstall with: crossfire -i <package_name>", "INFO")
+            
     return 0
 
+def _attempts_to_json(attempts: List[Tuple[str, RunResult]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "manager": m, 
+            "result": {
+                "ok": r.ok, 
+                "code": r.code, 
+                "stdout": r.out, 
+                "stderr": r.err
+            }
+        } for m, r in attempts
+    ]
+
+def _handle_install(args) -> int:
+    pkg = args.install
+    success, attempts = install_package(pkg, preferred_manager=args.manager)
+    
+    if LOG.json_mode:
+        output = {
+            "package": pkg, 
+            "success": success, 
+            "attempts": _attempts_to_json(attempts)
+        }
+        emit_json(output)
+    return 0 if success else 1
+
+def _handle_remove(args) -> int:
+    pkg = args.remove
+    success, attempts = remove_package(pkg, args.manager)
+    
+    if LOG.json_mode:
+        output = {
+            "package": pkg, 
+            "success": success, 
+            "attempts": _attempts_to_json(attempts)
+        }
+        emit_json(output)
+    return 0 if success else 1
+
+def _handle_install_from(args) -> int:
+    results = bulk_install_from_file(args.install_from)
+    if LOG.json_mode:
+        emit_json(results)
+    return 0 if results.get("success", False) else 1
+
+def _handle_export(args) -> int:
+    success = export_packages(args.export, args.output)
+    return 0 if success else 1
+
+def _handle_cleanup(args) -> int:
+    ok, results = cleanup_system()
+    if LOG.json_mode:
+        emit_json(results)
+    return 0 if ok else 1
+
+# Command flags in priority order: the first one present on the command line runs.
+COMMAND_DISPATCH: Tuple[Tuple[str, Any], ...] = (
+    ("setup", _handle_setup),
+    ("install_manager", _handle_install_manager),
+    ("speed_test", _handle_speed_test),
+    ("ping_test", _handle_ping_test),
+    ("crossupdate", _handle_crossupdate),
+    ("update_manager", _handle_update_manager),
+    ("list_managers", _handle_list_managers),
+    ("list_installed", _handle_list_installed),
+    ("stats", _handle_stats),
+    ("health_check", _handle_health_check),
+    ("search", _handle_search),
+    ("install", _handle_install),
+    ("remove", _handle_remove),
+    ("install_from", _handle_install_from),
+    ("export", _handle_export),
+    ("cleanup", _handle_cleanup),
+)
+
+# Commands that run with an empty value: bare --setup stores its "" const,
+# and -cu "" falls back to the default update URL
+_EMPTY_VALUE_COMMANDS = frozenset({"setup", "crossupdate"})
+
 def main(argv: Optional[List[str]] = None) -> int:
     """Enhanced main execution entry point."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv == ["--version"]:
+        # Common probe from scripts; answer it without building the parser
+        sys.stdout.write(f"CrossFire {__version__}\n")
+        return 0
+    
     parser = create_parser()
     args = parser.parse_args(argv)
 
@@ -2006,216 +3061,16 @@ def main(argv: Optional[List[str]] = None) -> int:
     LOG.json_mode = args.json
     
     try:
-        # Handle the setup command
-        if args.setup:
-            cprint("Running production setup...", "INFO")
-            
-            path_success = add_to_path_safely()
-            installed_path = install_launcher()
-            
-            if installed_path and path_success:
-                cprint(f"\nSetup Complete!", "SUCCESS")
-                cprint("    • CrossFire is now available globally as 'crossfire'", "SUCCESS")
-                cprint("    • Restart your terminal or run: source ~/.bashrc", "INFO")
-                cprint("    • Try: crossfire -s 'python library' to test search", "CYAN")
-                cprint("    • Database initialized for package tracking", "INFO")
-            else:
-                cprint("Setup completed with some issues.", "WARNING")
-            return 0
-
-        # Install manager command - FIXED
-        if args.install_manager:
-            manager = args.install_manager.lower()
-            success = install_manager(manager)
-            if LOG.json_mode:
-                print(json.dumps({"manager": manager, "success": success}, indent=2))
-            return 0 if success else 1
-
-        # Network testing commands
-        if args.speed_test:
-            test_url = args.test_url
-            duration = args.test_duration
-            result = SpeedTest.test_download_speed(test_url, duration)
-            if LOG.json_mode:
-                print(json.dumps(result, indent=2))
-            return 0 if result.get("ok") else 1
-        
-        if args.ping_test:
-            result = SpeedTest.ping_test()
-            if LOG.json_mode:
-                print(json.dumps(result, indent=2))
-            return 0
-
-        # Update commands
-        if args.crossupdate is not None:
-            url = args.crossupdate or DEFAULT_UPDATE_URL
-            success = cross_update(url, verify_sha256=args.sha256)
-            return 0 if success else 1
-        
-        if args.update_manager:
-            target = args.update_manager.upper()
-            if target == "ALL":
-                results = _update_all_managers()
-            else:
-                # Convert target back to proper case for lookup
-                proper_name = None
-                for name in MANAGER_INSTALL_HANDLERS.keys():
-                    if name.upper() == target:
-                        proper_name = name
-                        break
-                
-                if not proper_name:
-                    cprint(f"Unknown package manager: {args.update_manager}", "ERROR")
-                    return 1
-                    
-                name, ok, msg = _update_manager(proper_name)
-                results = {name: {"ok": str(ok).lower(), "msg": msg}}
-                status_icon = "Success" if ok else "Failed"
-                cprint(f"{name}: {msg}", "SUCCESS" if ok else "ERROR")
-                
-            if LOG.json_mode:
-                print(json.dumps(results, indent=2, ensure_ascii=False))
-            return 0 if all(r.get("ok") == "true" for r in results.values()) else 1
-
-        # Information commands
-        if args.list_managers:
-            status_info = list_managers_status()
-            if LOG.json_mode:
-                print(json.dumps(status_info, indent=2, ensure_ascii=False))
-            else:
-                cprint("Package Manager Status:", "INFO")
-                for manager, status in sorted(status_info.items()):
-                    if status == "Installed":
-                        status_icon = f"Available"
-                        color = "SUCCESS"
-                    elif status == "Not Installed":
-                        status_icon = f"Not Available"
-                        color = "MUTED"
-                    else:
-                        status_icon = f"Unknown"
-                        color = "WARNING"
-                    cprint(f" {manager}: {status}", color)
-                    
-                cprint(f"\nInstall managers with: crossfire --install-manager <name>", "INFO")
-            return 0
-        
-        if args.list_installed:
-            show_installed_packages()
-            return 0
-        
-        if args.stats:
-            show_statistics()
-            return 0
-        
-        if args.health_check:
-            results = health_check()
-            if LOG.json_mode:
-                print(json.dumps(results, indent=2, default=str))
-            return 0 if results["overall_status"] == "healthy" else 1
-
-        # Search command - REAL implementation
-        if args.search:
-            results = search_engine.search(args.search, args.manager, args.search_limit)
-            
-            if LOG.json_mode:
-                output = {
-                    "query": args.search, 
-                    "results": [r.to_dict() for r in results],
-                    "total_found": len(results)
-                }
-                print(json.dumps(output, indent=2, ensure_ascii=False))
-            else:
-                if not results:
-                    cprint(f"No packages found for '{args.search}'", "WARNING")
-                    cprint("Try different keywords or check internet connection", "INFO")
-                    return 1
-                
-                cprint(f"Search Results for '{args.search}' (Found {len(results)})", "SUCCESS")
-                cprint("=" * 70, "CYAN")
-                
-                for i, pkg in enumerate(results, 1):
-                    # Relevance indicator
-                    stars = min(5, max(1, int(pkg.relevance_score // 20)))
-                    relevance_stars = "⭐" * stars
-                    
-                    cprint(f"\n{i:2d}. {pkg.name} ({_manager_human(pkg.manager)}) {relevance_stars}", "SUCCESS")
-                    if pkg.version:
-                        cprint(f"      Version: {pkg.version}", "INFO")
-                    if pkg.description:
-                        desc = pkg.description[:120] + "..." if len(pkg.description) > 120 else pkg.description
-                        cprint(f"      {desc}", "MUTED")
-                    if pkg.homepage:
-                        cprint(f"      {pkg.homepage}", "CYAN")
-                
-                cprint(f"\nInstall with: crossfire -i <package_name>", "INFO")
-                
-            return 0
-        
-        # Package management commands
-        if args.install:
-            pkg = args.install
-            success, attempts = install_package(pkg, preferred_manager=args.manager)
-            
-            if LOG.json_mode:
-                output = {
-                    "package": pkg, 
-                    "success": success, 
-                    "attempts": [
-                        {
-                            "manager": m, 
-                            "result": {
-                                "ok": r.ok, 
-                                "code": r.code, 
-                                "stdout": r.out, 
-                                "stderr": r.err
-                            }
-                        } for m, r in attempts
-                    ]
-                }
-                print(json.dumps(output, indent=2, ensure_ascii=False))
-            return 0 if success else 1
-        
-        if args.remove:
-            success, attempts = remove_package(args.remove, args.manager)
-            
-            if LOG.json_mode:
-                output = {
-                    "package": args.remove, 
-                    "success": success, 
-                    "attempts": [
-                        {
-                            "manager": m, 
-                            "result": {
-                                "ok": r.ok, 
-                                "code": r.code, 
-                                "stdout": r.out, 
-                                "stderr": r.err
-                            }
-                        } for m, r in attempts
-                    ]
-                }
-                print(json.dumps(output, indent=2, ensure_ascii=False))
-            return 0 if success else 1
-        
-        if args.install_from:
-            results = bulk_install_from_file(args.install_from)
-            if LOG.json_mode:
-                print(json.dumps(results, indent=2, default=str))
-            return 0 if results.get("success", False) else 1
-        
-        if args.export:
-            success = export_packages(args.export, args.output)
-            return 0 if success else 1
-        
-        if args.cleanup:
-            results = cleanup_system()
-            if LOG.json_mode:
-                print(json.dumps(results, indent=2, ensure_ascii=False))
-            return 0 if any(r.get("ok") == "true" for r in results.values()) else 1
-            
+        for attr, handler in COMMAND_DISPATCH:
+            # Unset flags are None (value options) or False (store_true); an
+            # empty value (-s "") counts as unset unless "" is meaningful
+            value = getattr(args, attr)
+            if value or (value == "" and attr in _EMPTY_VALUE_COMMANDS):
+                return handler(args)
         
         # No specific command given, show enhanced status
-        return show_enhanced_status()
+        with LOG.batched():
+            return show_enhanced_status()
         
     except KeyboardInterrupt:
         cprint("\nOperation cancelled by user.", "WARNING")
@@ -2228,12 +3083,5 @@ def main(argv: Optional[List[str]] = None) -> int:
         return 1
 
 if __name__ == "__main__":
-    
-    # Ensure we have required dependencies
-    try:
-        import requests
-    except ImportError:
-        print("Missing required dependency 'requests'. Install with: pip install requests")
-        sys.exit(1)
-    
+    # requests is imported by the commands that need it (see _require_requests)
     sys.exit(main())
\ No newline at end of file